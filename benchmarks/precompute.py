@@ -0,0 +1,70 @@
+"""Build time of the engine of a large synthetic file, with and without the pool.
+
+Every year is aggregated from the snapshot, here (``workers`` 1) or by a
+pool of processes, and ``build_engine`` from the parsed teams is timed for
+reference. The pool only wins with free cores and enough teams per year.
+
+    python benchmarks/precompute.py
+    python benchmarks/precompute.py --teams 20000 --workers 2 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def best(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure(path, workers, repeat):
+    from icpc import build_engine, load_snapshot, precompute_engine, snapshot_path
+
+    dataset = load_snapshot(path)
+    target = snapshot_path(path)
+    yield "build_engine", 1, best(lambda: build_engine(dataset), repeat)
+    for n in [1] + workers:
+        elapsed = best(lambda: precompute_engine(dataset, n, target), repeat)
+        yield "precompute_engine", n, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=8000, help="teams per year")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--workers", type=int, action="append", default=[])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case")
+    args = parser.parse_args(argv)
+    workers = args.workers or [2, os.cpu_count() or 1]
+
+    from icpc.synth import write_synthetic
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synth.json")
+        write_synthetic(
+            path,
+            teams=args.teams,
+            years=args.years,
+            universities=max(600, args.teams // 4),
+        )
+        rows = list(measure(path, sorted(set(workers) - {1}), args.repeat))
+
+    serial = next(t for name, n, t in rows if name == "precompute_engine" and n == 1)
+    print(f"{args.teams} teams x {args.years} years, {os.cpu_count()} cpus")
+    for name, n, elapsed in rows:
+        speedup = serial / elapsed
+        print(f"{name:<18} workers={n:<3} {elapsed * 1000:9.1f} ms  x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    main()
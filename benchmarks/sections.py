@@ -0,0 +1,330 @@
+"""Wall time and peak memory of every dashboard section, run headless.
+
+Each section is measured by running ``app.py`` through Streamlit's AppTest with
+only that section's chart expander open, once with the default parameters and
+once with the worst case ones (full period, "Todas", every university, the
+universities with the most editions). The peak memory is the one of the
+section span, from a run with ``?profile``.
+
+    python benchmarks/sections.py
+    python benchmarks/sections.py --scale 10 --scale 50 --json bench.json
+
+``--scale N`` repeats every team of the real file N times under new university
+names, ``--synth TEAMS`` generates a synthetic file with TEAMS finalists per
+year and ``--data FILE`` adds any other results file. Every dataset runs in
+its own process so the Streamlit caches start empty. Cold and memory runs
+empty the section caches again and use a new result cache file.
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+sys.path.insert(0, ROOT)
+
+# Worst case markers: every option, the highest value, the whole slider.
+ALL = object()
+MAX = object()
+FULL = object()
+
+
+class Most:
+    """Worst case marker: the university with the ``rank``-th most editions
+    of the sequence graphs, 0 the first.
+    """
+
+    def __init__(self, rank):
+        self.rank = rank
+
+
+# (title, chart expander key, worst case widget values)
+SECTIONS = [
+    (
+        "Participaciones por país",
+        "c_charts",
+        {"c_period": FULL, "c_min": 1, "c_regions": ["Todas"]},
+    ),
+    (
+        "Participaciones por universidades",
+        "u_charts",
+        {"u_part_period": FULL, "u_part_min": 1, "u_part_regions": ["Todas"]},
+    ),
+    (
+        "Problemas resueltos por universidad",
+        "p_charts",
+        {"p_part_period": FULL, "p_part_regions": ["Todas"], "p_univs": ALL},
+    ),
+    (
+        "Lugar general por universidades",
+        "po_charts",
+        {"po_period": FULL, "po_part_regions": ["Todas"], "po_multiselect": ALL},
+    ),
+    (
+        "Acumulado de problemas resueltos",
+        "a_charts",
+        {"a_period": FULL, "a_part_regions": ["Todas"], "a_slider": MAX},
+    ),
+    (
+        "Miembros de los equipos",
+        "t_charts",
+        {"t_period": FULL, "t_part_regions": ["Todas"], "t_slider": MAX},
+    ),
+    (
+        "Secuencia de participaciones por universidad",
+        "s_charts",
+        {"s1_univs": Most(0), "s2_univs": Most(1)},
+    ),
+    (
+        "Cantidad de universidades finalistas por país",
+        "f_charts",
+        {"univ_period": FULL, "univ_min": 1, "univ_regions": ["Todas"]},
+    ),
+    (
+        "Posiciones y medallas por universidades",
+        "m_charts",
+        {
+            "minimal_position_parts1": FULL,
+            "u_part_min1": 1,
+            "regions_uni": ["Todas"],
+        },
+    ),
+    (
+        "Posiciones y medallas por País",
+        "cm_charts",
+        {"cm_period": FULL, "cm_min": 1, "cm_regions": ["Todas"]},
+    ),
+]
+
+WIDGETS = ("select_slider", "slider", "selectbox", "multiselect")
+
+
+def find_widget(at, key):
+    for kind in WIDGETS:
+        for widget in getattr(at, kind):
+            if widget.key == key:
+                return widget
+    raise KeyError(key)
+
+
+def most_editions():
+    """Universities by editions from the first default year, most first."""
+    from icpc import DEFAULT_FIRST, load_snapshot
+
+    dataset = load_snapshot()
+    editions = Counter()
+    for year in dataset.years:
+        if year >= DEFAULT_FIRST:
+            teams = dataset.contests[str(year)]
+            editions.update({team.university_id for team in teams})
+    return [dataset.identities.names[u] for u, _ in editions.most_common()]
+
+
+def configure(at, values):
+    for key, value in values.items():
+        # The selectors only list the search matches, these universities are
+        # chosen through the session state.
+        if value is ALL:
+            from icpc import load_snapshot
+
+            at.session_state[key] = list(load_snapshot().identities.names)
+            continue
+        if isinstance(value, Most):
+            at.session_state[key] = most_editions()[value.rank]
+            continue
+        widget = find_widget(at, key)
+        if value is MAX:
+            value = widget.max
+        elif value is FULL and widget.type == "select_slider":
+            value = (int(widget.options[0]), int(widget.options[-1]))
+        elif value is FULL:
+            value = (widget.min, widget.max)
+        widget.set_value(value)
+
+
+def timed(at, chart=None):
+    if chart:
+        # The expander reports itself closed after a run, open it every time.
+        at.session_state[chart] = True
+    start = time.perf_counter()
+    at.run()
+    wall = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return wall
+
+
+def span_peak(at, title, chart=None):
+    """Run ``at`` with ``?profile``, peak KiB of its ``title`` span."""
+    at.query_params["profile"] = "1"
+    try:
+        timed(at, chart)
+    finally:
+        del at.query_params["profile"]
+    records = at.session_state["profiler"].records
+    return next(r["peak_kib"] for r in reversed(records) if r["span"] == title)
+
+
+def new_app():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=600)
+    at.run()
+    return at
+
+
+def cold_caches(paths):
+    """Empty the Streamlit caches of the sections and give them the next
+    empty result cache file of ``paths``, the data stays loaded.
+    """
+    import streamlit as st
+    from icpc import profiling
+
+    st.cache_data.clear()
+    profiling.clear_counted()
+    os.environ["ICPC_CACHE"] = next(paths)
+
+
+def measure(label, repeat):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    base = os.environ.get("ICPC_CACHE") or os.path.join(tempfile.mkdtemp(), "db")
+    fresh = (f"{base}.{n}" for n in itertools.count())
+    records = []
+
+    def record(section, mode, cold, warm, peak):
+        records.append(
+            {
+                "dataset": label,
+                "section": section,
+                "mode": mode,
+                "cold_ms": round(cold * 1000, 1),
+                "warm_ms": round(warm * 1000, 1),
+                "peak_kib": peak,
+            }
+        )
+
+    cold_caches(fresh)
+    at = AppTest.from_file(APP, default_timeout=600)
+    cold = timed(at)
+    warm = min(timed(at) for _ in range(repeat))
+    st.cache_resource.clear()
+    peak = span_peak(AppTest.from_file(APP, default_timeout=600), "Carga de datos")
+    record("Carga de datos", "todo cerrado", cold, warm, peak)
+
+    for title, chart, worst in SECTIONS:
+        for mode, values in (("default", {}), ("peor caso", worst)):
+            at = new_app()
+            configure(at, values)
+
+            cold_caches(fresh)
+            cold = timed(at, chart)
+            warm = min(timed(at, chart) for _ in range(repeat))
+            cold_caches(fresh)
+            peak = span_peak(at, title, chart)
+            record(title, mode, cold, warm, peak)
+    return records
+
+
+def scaled_copy(source, factor, directory):
+    """The real results with every team repeated ``factor`` times per year."""
+    with open(source, encoding="UTF-8") as file:
+        data = json.load(file)
+    scaled = copy.deepcopy(data)
+    for year, teams in data["contests"].items():
+        scaled["contests"][year] = []
+        for team in teams:
+            for k in range(factor):
+                clone = dict(team)
+                if k:
+                    clone["university"] = f"{team['university']} [{k}]"
+                    clone["team"] = f"{team['team']} [{k}]"
+                    clone["players"] = [
+                        None if p is None else f"{p} [{k}]" for p in team["players"]
+                    ]
+                scaled["contests"][year].append(clone)
+    for country in scaled["countries"].values():
+        universities = country.get("universities", {})
+        for university, aliases in list(universities.items()):
+            for k in range(1, factor):
+                universities[f"{university} [{k}]"] = {
+                    "teams": [f"{t} [{k}]" for t in aliases["teams"]]
+                }
+    target = os.path.join(directory, f"data-x{factor}.json")
+    with open(target, "w", encoding="UTF-8") as file:
+        json.dump(scaled, file)
+    return target
+
+
+def print_table(records):
+    header = ("dataset", "section", "mode", "cold_ms", "warm_ms", "peak_kib")
+    rows = [header] + [tuple(str(r[k]) for k in header) for r in records]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, action="append", default=[])
+    parser.add_argument("--synth", type=int, action="append", default=[])
+    parser.add_argument("--data", action="append", default=[])
+    parser.add_argument("--repeat", type=int, default=3, help="warm runs per case")
+    parser.add_argument("--json", help="also write the records to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        logging.disable(logging.WARNING)
+        for line in measure(args.child, args.repeat):
+            print(json.dumps(line, ensure_ascii=False))
+        return
+
+    from icpc.dataset import DATA_PATH
+    from icpc.synth import write_synthetic
+
+    records = []
+    with tempfile.TemporaryDirectory() as directory:
+        datasets = [("real", DATA_PATH)]
+        datasets += [
+            (f"x{n}", scaled_copy(DATA_PATH, n, directory)) for n in args.scale
+        ]
+        for teams in args.synth:
+            path = os.path.join(directory, f"synth-{teams}.json")
+            write_synthetic(path, teams=teams, universities=max(600, teams // 4))
+            datasets.append((f"synth {teams}", path))
+        datasets += [(os.path.basename(path), path) for path in args.data]
+        for n, (label, path) in enumerate(datasets):
+            cache = os.path.join(directory, f"results-{n}.db")
+            child = subprocess.run(
+                [sys.executable, __file__, "--child", label]
+                + ["--repeat", str(args.repeat)],
+                env={
+                    **os.environ,
+                    "ICPC_DATA": os.path.abspath(path),
+                    "ICPC_CACHE": cache,
+                },
+                stdout=subprocess.PIPE,
+                text=True,
+                check=True,
+            )
+            records += [json.loads(line) for line in child.stdout.splitlines()]
+
+    print_table(records)
+    if args.json:
+        with open(args.json, "w", encoding="UTF-8") as file:
+            json.dump(records, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from .identity import Identities, build_identities, canonical_key
+from .dataset import (
+    ALL_REGIONS,
+    DATA_PATH,
+    UNKNOWN,
+    Dataset,
+    Team,
+    YearTeams,
+    content_digest,
+    file_digest,
+    load_dataset,
+    parse_dataset,
+    replacing,
+    year_teams,
+)
+from .cubes import (
+    Cubes,
+    YearCounts,
+    YearCube,
+    build_cubes,
+    extend_cubes,
+    merge_cubes,
+    year_counts,
+)
+from .placements import (
+    PLACE_COLUMNS,
+    country_rankings,
+    country_tables,
+    medal_table,
+    placement_table,
+)
+from .players import (
+    Appearance,
+    Appearances,
+    PlayerIndex,
+    YearPlayers,
+    build_player_index,
+    extend_player_index,
+    merge_player_index,
+    year_players,
+)
+from .graphs import render_all, render_svg, university_graph
+from .snapshot import (
+    alias_rows,
+    append_snapshot,
+    compile_snapshot,
+    extend_dataset,
+    load_snapshot,
+    read_aliases,
+    read_year_teams,
+    snapshot_path,
+)
+from .synth import generate, write_synthetic
+from .ranks import (
+    RankGrid,
+    band_names,
+    build_rank_grid,
+    extend_rank_grid,
+    merge_rank_grid,
+    year_rows,
+)
+from .histograms import (
+    SolvedHistogram,
+    build_solved_histogram,
+    extend_solved_histogram,
+    merge_solved_histogram,
+    year_histogram,
+)
+from .search import SearchIndex, build_search_index
+from .engine import Engine, build_engine, merge_engine, year_aggregates
+from .precompute import WORKERS, precompute_engine, snapshot_aggregates
+from .views import (
+    DEFAULT_AMOUNT,
+    DEFAULT_FIRST,
+    DEFAULT_MIN_FINALISTS,
+    DEFAULT_MIN_PARTS,
+    DEFAULT_TABLE_MIN_PARTS,
+    Views,
+    compile_views,
+    default_views,
+    read_views,
+    views_path,
+)
+from .ingest import extend_engine, ingest_year, merge_year, refresh
+from .results import MAX_BYTES, ResultCache, results_path
+from .watch import WATCH_INTERVAL, DataWatcher
@@ -0,0 +1,98 @@
+"""Command line tools: ``python -m icpc <command> --help``."""
+
+import argparse
+
+from .dataset import DATA_PATH, load_dataset
+from .ingest import ingest_year
+from .precompute import WORKERS, precompute_engine
+from .snapshot import compile_snapshot, load_snapshot, snapshot_path
+from .synth import write_synthetic
+from .views import compile_views, views_path
+
+
+def snapshot(args):
+    target = snapshot_path(args.data)
+    compile_snapshot(load_dataset(args.data), target)
+    print(target)
+
+
+def views(args):
+    target = views_path(args.data)
+    engine = precompute_engine(
+        load_snapshot(args.data), args.workers, snapshot_path(args.data)
+    )
+    compile_views(engine, target)
+    print(target)
+
+
+def ingest(args):
+    year = ingest_year(args.source, args.data)
+    print(f"{year} -> {args.data}")
+    if args.views:
+        views(args)
+
+
+def synth(args):
+    write_synthetic(
+        args.target,
+        teams=args.teams,
+        years=args.years,
+        universities=args.universities,
+        countries=args.countries,
+        reuse=args.reuse,
+        seed=args.seed,
+    )
+    print(args.target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m icpc")
+    parser.add_argument("--data", default=DATA_PATH, help="results JSON file")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="processes that aggregate the years of the engine",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser(
+        "snapshot", help="compile the columnar snapshot of the data file"
+    ).set_defaults(run=snapshot)
+
+    commands.add_parser(
+        "views", help="precompute the default views of every section"
+    ).set_defaults(run=views)
+
+    command = commands.add_parser(
+        "ingest", help="add the results of a new year to the data file"
+    )
+    command.add_argument("source", help="JSON file with the contests of one year")
+    command.add_argument(
+        "--views", action="store_true", help="also precompute the default views"
+    )
+    command.set_defaults(run=ingest)
+
+    command = commands.add_parser(
+        "synth", help="write a synthetic results file of any size"
+    )
+    command.add_argument("target", help="output JSON file")
+    command.add_argument("--teams", type=int, default=140, help="teams per year")
+    command.add_argument("--years", type=int, default=19)
+    command.add_argument("--universities", type=int, default=600)
+    command.add_argument("--countries", type=int, default=80)
+    command.add_argument(
+        "--reuse",
+        type=float,
+        default=0.3,
+        help="chance of a player returning for the same university next year",
+    )
+    command.add_argument("--seed", type=int, default=0)
+    command.set_defaults(run=synth)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
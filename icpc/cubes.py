@@ -0,0 +1,224 @@
+"""Cumulative by year counters, a year range is the difference of two rows."""
+
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+import numpy as np
+
+from .dataset import UNKNOWN, year_teams
+
+UNIVERSITY_MEASURES = ("participations", "teams", "solved", "problems")
+
+
+class YearCube(NamedTuple):
+    years: tuple
+    keys: tuple
+    regions: np.ndarray
+    prefix: dict
+
+    def span(self, first, last):
+        return bisect_left(self.years, first), bisect_right(self.years, last)
+
+    def range_sum(self, measure, first, last):
+        lo, hi = self.span(first, last)
+        table = self.prefix[measure]
+        return table[hi] - table[lo]
+
+    def in_regions(self, mask):
+        return (mask >> self.regions) & 1 == 1
+
+
+class Cubes(NamedTuple):
+    countries: YearCube
+    universities: YearCube
+    university_country: np.ndarray
+
+    def universities_per_country(self, first, last):
+        active = self.universities.range_sum("participations", first, last) > 0
+        return np.bincount(
+            self.university_country[active], minlength=len(self.countries.keys)
+        )
+
+
+def _cumulative(counts):
+    prefix = np.zeros((counts.shape[0] + 1, counts.shape[1]), dtype=np.int64)
+    np.cumsum(counts, axis=0, out=prefix[1:])
+    return prefix
+
+
+def _cube(years, keys, regions, measures):
+    return YearCube(
+        years=years,
+        keys=tuple(keys),
+        regions=np.array(regions, dtype=np.int64),
+        prefix={name: _cumulative(counts) for name, counts in measures.items()},
+    )
+
+
+class YearCounts(NamedTuple):
+    """Counters of a single year, merged into the cubes in year order."""
+
+    # Country codes in order of first appearance in the year, and regions.
+    countries: np.ndarray
+    country_regions: np.ndarray
+    # University ids of the year and the country code of their first team.
+    university_ids: np.ndarray
+    university_countries: np.ndarray
+    # Measure to its counts by university id.
+    universities: dict
+
+
+def year_counts(teams, problems, n_universities):
+    """Counters of the ``YearTeams`` of a year with ``problems`` problems."""
+    # First team of every country, in contest order.
+    first = np.sort(np.unique(teams.country, return_index=True)[1])
+    universities, first_team = np.unique(teams.university, return_index=True)
+    counts = np.bincount(teams.university, minlength=n_universities)
+    known = teams.solved != UNKNOWN
+    solved = np.bincount(
+        teams.university[known], weights=teams.solved[known], minlength=n_universities
+    )
+    return YearCounts(
+        countries=teams.country[first],
+        country_regions=teams.region[first],
+        university_ids=universities,
+        university_countries=teams.country[first_team],
+        universities={
+            "participations": (counts > 0).astype(np.int64),
+            "teams": counts.astype(np.int64),
+            "solved": solved.astype(np.int64),
+            "problems": counts.astype(np.int64) * problems,
+        },
+    )
+
+
+def year_problems(dataset, year):
+    # Years before 2010 have no stats entry.
+    return len(dataset.stats.get(str(year), {}).get("problems", ""))
+
+
+def _countries(country_index, country_regions, university_country, keys, counts):
+    """Add the countries and university countries first seen in ``counts``,
+    whose country codes are positions in ``keys``.
+    """
+    for code, region in zip(counts.countries.tolist(), counts.country_regions.tolist()):
+        if keys[code] not in country_index:
+            country_index[keys[code]] = len(country_index)
+            country_regions.append(region)
+    for university, code in zip(
+        counts.university_ids.tolist(), counts.university_countries.tolist()
+    ):
+        if university_country[university] < 0:
+            university_country[university] = country_index[keys[code]]
+
+
+def merge_cubes(years, universities, country_keys, counts):
+    """Cubes of the ``counts`` of every year, in the order of ``years``.
+
+    Countries are numbered by first appearance over all of ``years``, like
+    the university ids are over the whole file. Views break ties by those
+    numbers, so ties follow the first appearance in the whole history, not
+    in the range a view asks for.
+    """
+    country_index = {}
+    country_regions = []
+    university_country = [-1] * len(universities)
+    for year_count in counts:
+        _countries(
+            country_index, country_regions, university_country, country_keys, year_count
+        )
+
+    country_parts = np.zeros((len(years), len(country_index)), dtype=np.int32)
+    measures = {
+        name: np.zeros((len(years), len(universities)), dtype=np.int32)
+        for name in UNIVERSITY_MEASURES
+    }
+    for row, year_count in enumerate(counts):
+        for code in year_count.countries.tolist():
+            country_parts[row, country_index[country_keys[code]]] = 1
+        for name in UNIVERSITY_MEASURES:
+            measures[name][row] = year_count.universities[name]
+
+    university_country = np.array(university_country, dtype=np.int64)
+
+    return Cubes(
+        countries=_cube(
+            years,
+            country_index,
+            country_regions,
+            {"participations": country_parts},
+        ),
+        universities=_cube(
+            years,
+            universities,
+            [country_regions[c] for c in university_country],
+            measures,
+        ),
+        university_country=university_country,
+    )
+
+
+def build_cubes(dataset):
+    universities = dataset.identities.names
+    counts = [
+        year_counts(teams, year_problems(dataset, year), len(universities))
+        for year, teams in zip(dataset.years, dataset.columns())
+    ]
+    return merge_cubes(dataset.years, universities, dataset.country_keys, counts)
+
+
+def _extend_cube(cube, year, keys, regions, counts):
+    n = len(keys)
+    prefix = {}
+    for name, table in cube.prefix.items():
+        # The old rows are copied as they are, new keys start at zero.
+        grown = np.zeros((table.shape[0] + 1, n), dtype=table.dtype)
+        grown[:-1, : table.shape[1]] = table
+        grown[-1] = grown[-2] + counts[name]
+        prefix[name] = grown
+    return YearCube(
+        years=cube.years + (year,),
+        keys=tuple(keys),
+        regions=np.array(regions, dtype=np.int64),
+        prefix=prefix,
+    )
+
+
+def extend_cubes(cubes, dataset, year):
+    """``cubes`` plus the row of ``year``, which follows all of their years."""
+    universities = dataset.identities.names
+    counts = year_counts(
+        year_teams(dataset.contests[str(year)], {}),
+        year_problems(dataset, year),
+        len(universities),
+    )
+    keys = dataset.country_keys
+    country_index = {key: c for c, key in enumerate(cubes.countries.keys)}
+    country_regions = cubes.countries.regions.tolist()
+    university_country = cubes.university_country.tolist()
+    university_country += [-1] * (len(universities) - len(university_country))
+    _countries(country_index, country_regions, university_country, keys, counts)
+
+    country_parts = np.zeros(len(country_index), dtype=np.int64)
+    for code in counts.countries.tolist():
+        country_parts[country_index[keys[code]]] = 1
+
+    university_country = np.array(university_country, dtype=np.int64)
+
+    return Cubes(
+        countries=_extend_cube(
+            cubes.countries,
+            year,
+            country_index,
+            country_regions,
+            {"participations": country_parts},
+        ),
+        universities=_extend_cube(
+            cubes.universities,
+            year,
+            universities,
+            [country_regions[c] for c in university_country],
+            counts.universities,
+        ),
+        university_country=university_country,
+    )
@@ -0,0 +1,222 @@
+"""Parsed, read-only view of the ICPC results file."""
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+from .identity import Identities, build_identities
+
+# ICPC_DATA points the app and the tools to another results file.
+DATA_PATH = os.environ.get("ICPC_DATA") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "data-2006-2024.json",
+)
+
+# Value used for "?", "finalist" and any other non numeric field.
+UNKNOWN = -1
+
+ALL_REGIONS = "Todas"
+
+
+class Team(NamedTuple):
+    position: int
+    country: str
+    university: str
+    team: str
+    solved: int
+    time: int
+    players: tuple
+    country_code: int
+    region_code: int
+    university_id: int
+
+
+class YearTeams(NamedTuple):
+    """Numeric columns of the teams of a year, in contest order."""
+
+    university: np.ndarray
+    country: np.ndarray
+    region: np.ndarray
+    solved: np.ndarray
+    # One entry per (team, player): the code of the player and their team.
+    player: np.ndarray
+    player_team: np.ndarray
+
+
+def year_teams(teams, players):
+    """Columns of ``teams``. ``players`` numbers the names met so far, and
+    gets the new ones.
+    """
+    player = []
+    player_team = []
+    for row, team in enumerate(teams):
+        for name in team.players:
+            player.append(players.setdefault(name, len(players)))
+            player_team.append(row)
+    return YearTeams(
+        university=np.array([t.university_id for t in teams], dtype=np.int64),
+        country=np.array([t.country_code for t in teams], dtype=np.int64),
+        region=np.array([t.region_code for t in teams], dtype=np.int64),
+        solved=np.array([t.solved for t in teams], dtype=np.int64),
+        player=np.array(player, dtype=np.int64),
+        player_team=np.array(player_team, dtype=np.int64),
+    )
+
+
+class Dataset(NamedTuple):
+    version: str
+    contests: dict
+    regions: dict
+    countries: dict
+    stats: dict
+    years: tuple
+    region_keys: tuple
+    country_keys: tuple
+    region_codes: dict
+    identities: Identities
+
+    def region_mask(self, names):
+        """Bitmask of the regions whose spanish name is in ``names``."""
+        if ALL_REGIONS in names:
+            return (1 << len(self.region_keys)) - 1
+        mask = 0
+        for code, key in enumerate(self.region_keys):
+            if self.regions[key]["spanish_name"] in names:
+                mask |= 1 << code
+        return mask
+
+    def columns(self):
+        """``YearTeams`` of every year, the players numbered across them."""
+        players = {}
+        return [year_teams(self.contests[str(year)], players) for year in self.years]
+
+    def teams_in_regions(self, year, mask):
+        teams = self.contests[str(year)]
+        if mask == (1 << len(self.region_keys)) - 1:
+            return teams
+        selected = (mask >> self.region_codes[str(year)]) & 1
+        return [teams[i] for i in np.flatnonzero(selected)]
+
+
+def parse_int(value):
+    # Shared places come as "64 - 65", the first one is kept.
+    head = str(value).split("-", 1)[0].strip()
+    return int(head) if head.isdigit() else UNKNOWN
+
+
+def parse_team(raw, country_codes, region_codes, identities):
+    university_id = identities.ids[raw["university"]]
+    return Team(
+        position=parse_int(raw["position"]),
+        country=raw["country"],
+        # Every spelling of a university shows the name of its id.
+        university=identities.names[university_id],
+        team=raw["team"],
+        solved=parse_int(raw["solved"]),
+        time=parse_int(raw["time"]),
+        players=tuple(raw["players"]),
+        country_code=country_codes[raw["country"]],
+        region_code=region_codes[raw["country"]],
+        university_id=university_id,
+    )
+
+
+def position_key(position):
+    return float("inf") if position == UNKNOWN else position
+
+
+def content_digest(content):
+    """Hash of the bytes of a results file, its data version."""
+    return hashlib.sha256(content).hexdigest()
+
+
+@contextmanager
+def replacing(target):
+    """Temporary path whose file replaces ``target`` when the block ends.
+
+    Several server processes may write at once, the rename is atomic. A block
+    that fails leaves ``target`` as it was and removes the temporary file.
+    """
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        yield tmp
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@lru_cache(maxsize=8)
+def _file_digest(path, mtime_ns, size):
+    with open(path, "rb") as file:
+        return content_digest(file.read())
+
+
+def file_digest(path=DATA_PATH):
+    """Content hash of ``path``, only recomputed when its mtime or size change."""
+    info = os.stat(path)
+    return _file_digest(path, info.st_mtime_ns, info.st_size)
+
+
+def load_dataset(path=DATA_PATH):
+    with open(path, "rb") as file:
+        content = file.read()
+    return parse_dataset(json.loads(content), content_digest(content))
+
+
+def parse_dataset(data, version, years=None):
+    """Dataset of the parsed results file, with only ``years`` when given."""
+    region_keys = tuple(data["regions"])
+    country_keys = tuple(data["countries"])
+    region_index = {key: code for code, key in enumerate(region_keys)}
+    country_codes = {key: code for code, key in enumerate(country_keys)}
+    region_codes = {
+        key: region_index[country["region"]]
+        for key, country in data["countries"].items()
+    }
+
+    # Teams are kept in finishing order, unranked ones last, so filtering a
+    # year keeps the regional ranking.
+    ordered = {
+        year: sorted(teams, key=lambda raw: position_key(parse_int(raw["position"])))
+        for year, teams in sorted(data["contests"].items(), key=lambda x: int(x[0]))
+    }
+    # Ids come from every year, the kept ones share them with the whole file.
+    identities = build_identities(
+        (raw["university"] for teams in ordered.values() for raw in teams),
+        (
+            (university, team)
+            for details in data["countries"].values()
+            for university, aliases in details.get("universities", {}).items()
+            for team in aliases["teams"]
+        ),
+    )
+    contests = {
+        year: tuple(
+            parse_team(raw, country_codes, region_codes, identities) for raw in teams
+        )
+        for year, teams in ordered.items()
+        if years is None or int(year) in years
+    }
+
+    return Dataset(
+        version=version,
+        contests=contests,
+        regions=data["regions"],
+        countries=data["countries"],
+        stats=data["stats"],
+        years=tuple(int(x) for x in contests),
+        region_keys=region_keys,
+        country_keys=country_keys,
+        region_codes={
+            year: np.array([team.region_code for team in teams], dtype=np.int64)
+            for year, teams in contests.items()
+        },
+        identities=identities,
+    )
@@ -0,0 +1,283 @@
+"""The numbers behind every dashboard section, without Streamlit.
+
+Every view takes a year range, the spanish names of the regions (``"Todas"``
+for all of them) and its thresholds, and returns arrays, Series or
+DataFrames ready to plot. Batch jobs use it through ``build_engine``.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .cubes import Cubes, merge_cubes, year_counts, year_problems
+from .dataset import ALL_REGIONS, Dataset
+from .histograms import SolvedHistogram, merge_solved_histogram, year_histogram
+from .placements import PLACE_COLUMNS, country_tables, medal_table, placement_table
+from .players import Appearances, PlayerIndex, merge_player_index, year_players
+from .ranks import RankGrid, band_names, merge_rank_grid, year_rows
+
+SOLVED_STATS = ("Mínimo", "Máximo", "Moda", "Mediana", "Media")
+REPEATED_RANKINGS = (
+    "repeated",
+    "repeated_percent",
+    "repeated_players",
+    "repeated_players_percent",
+)
+
+
+def ascending(keys, counts, keep):
+    """Series of the kept ``counts`` by key, smallest first, stable on ties."""
+    order = np.flatnonzero(keep)
+    order = order[np.argsort(counts[order], kind="stable")]
+    return pd.Series(counts[order], index=[keys[i] for i in order])
+
+
+def descending(keys, values, keep, n):
+    """Series of the ``n`` largest kept ``values`` by key, largest first,
+    stable on ties, NaN last.
+
+    Only those ``n`` are sorted, the rest are left behind by a partition.
+    """
+    kept = np.flatnonzero(keep)
+    missing = np.isnan(values[kept])
+    kept, missing = kept[~missing], kept[missing]
+    n = min(n, len(kept) + len(missing))
+    order = kept[:0]
+    if n and len(kept):
+        cut = max(len(kept) - n, 0)
+        threshold = np.partition(values[kept], cut)[cut]
+        above = kept[values[kept] > threshold]
+        ties = kept[values[kept] == threshold][: n - len(above)]
+        order = np.sort(np.concatenate([above, ties]))
+        order = order[np.argsort(-values[order], kind="stable")]
+    order = np.concatenate([order, missing[: n - len(order)]])
+    return pd.Series(values[order], index=[keys[i] for i in order])
+
+
+def percent(part, whole, keep):
+    """``part`` in percent of ``whole`` where kept, 0 elsewhere.
+
+    Like pandas, a zero ``whole`` gives inf, or NaN when ``part`` is zero too.
+    """
+    result = np.zeros(len(part))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result[keep] = part[keep] * 100 / whole[keep]
+    return result
+
+
+class Engine(NamedTuple):
+    dataset: Dataset
+    cubes: Cubes
+    players: PlayerIndex
+    ranks: RankGrid
+    histogram: SolvedHistogram
+
+    def mask(self, regions):
+        return self.dataset.region_mask(regions)
+
+    def periods(self, first, last):
+        return [y for y in self.dataset.years if first <= y <= last]
+
+    def country_participations(self, first, last, regions, min_parts):
+        counts = self.cubes.countries.range_sum("participations", first, last)
+        keep = counts >= min_parts
+        keep &= self.cubes.countries.in_regions(self.mask(regions))
+        return ascending(self.cubes.countries.keys, counts, keep)
+
+    def university_participations(self, first, last, regions, min_parts):
+        counts = self.cubes.universities.range_sum("participations", first, last)
+        keep = counts >= min_parts
+        keep &= self.cubes.universities.in_regions(self.mask(regions))
+        return ascending(self.cubes.universities.keys, counts, keep)
+
+    def university_ids(self, first, last, regions=(ALL_REGIONS,)):
+        """Ids of the universities with a team in the period."""
+        universities = self.cubes.universities
+        active = universities.range_sum("participations", first, last) > 0
+        active &= universities.in_regions(self.mask(regions))
+        return np.flatnonzero(active)
+
+    def solved_stats(self, first, last, regions):
+        """Min, max, mode, rounded median and mean of the solved problems.
+
+        Teams of unknown solved problems are left out, and so are the years
+        without any other team in ``regions``.
+        """
+        years, columns = self.histogram.stats(first, last, self.mask(regions))
+        table = pd.DataFrame(dict(zip(SOLVED_STATS, columns)), index=years)
+        return table.reindex(range(first, last + 1))
+
+    def solved_percentiles(self, first, last, regions, percents=(25, 50, 75)):
+        """Percentiles of the solved problems, one column per percent.
+
+        Teams of unknown solved problems are left out, and so are the years
+        without any other team in ``regions``.
+        """
+        years, values = self.histogram.percentiles(
+            first, last, self.mask(regions), percents
+        )
+        table = pd.DataFrame(
+            values, index=years, columns=[f"Percentil {p}" for p in percents]
+        )
+        return table.reindex(range(first, last + 1))
+
+    def best_teams(self, first, last, regions, universities):
+        """Place and solved problems of the best team of every university.
+
+        Places count only the teams of ``regions``. Returns the ``place`` and
+        ``solved`` DataFrames, one column per university, and the number of
+        teams ranked every year.
+        """
+        mask = self.mask(regions)
+        index = range(first, last + 1)
+        columns = list(universities)
+        ids = [self.dataset.identities.lookup(u) for u in columns]
+        place, solved = self.ranks.best_places(first, last, mask, ids)
+        return (
+            pd.DataFrame(place, index=index, columns=columns),
+            pd.DataFrame(solved, index=index, columns=columns),
+            pd.Series(self.ranks.team_counts(first, last, mask), index=index),
+        )
+
+    def solved_by_university(self, first, last, universities):
+        """Solved problems of the best team of every university, by year."""
+        return self.best_teams(first, last, (ALL_REGIONS,), universities)[1]
+
+    def place_bands(self, first, last, regions, parts=4):
+        """Last place of each of the ``parts`` bands the teams of every year
+        split into, counting only the teams of ``regions``.
+        """
+        return pd.DataFrame(
+            self.ranks.place_bands(first, last, self.mask(regions), parts),
+            index=range(first, last + 1),
+            columns=band_names(parts),
+        )
+
+    def solved_bands(self, first, last, regions, parts=4):
+        """Solved problems of the first team of each band of every year.
+
+        Years without teams in ``regions`` are left empty.
+        """
+        return pd.DataFrame(
+            self.ranks.solved_bands(first, last, self.mask(regions), parts),
+            index=range(first, last + 1),
+            columns=band_names(parts),
+        )
+
+    def top_accumulated(self, first, last, regions, n):
+        """The ``n`` universities with the most solved problems and the ``n``
+        with the highest percent of them, best first.
+        """
+        universities = self.cubes.universities
+        parts = universities.range_sum("participations", first, last)
+        solved = universities.range_sum("solved", first, last)
+        total = universities.range_sum("problems", first, last)
+        keep = (parts > 0) & universities.in_regions(self.mask(regions))
+        keys = universities.keys
+        return (
+            descending(keys, solved, keep, n),
+            descending(keys, percent(solved, total, keep), keep, n),
+        )
+
+    def top_repeated(self, first, last, regions, n):
+        """The ``n`` universities with the highest value of every column of
+        ``REPEATED_RANKINGS``, best first, among those with repeated teams.
+        """
+        counts = self.players.repeat_stats(first, last, self.mask(regions))
+        keep = counts["repeated"] > 0
+        counts["repeated_percent"] = percent(counts["repeated"], counts["teams"], keep)
+        counts["repeated_players_percent"] = percent(
+            counts["repeated_players"], counts["players"], keep
+        )
+        keys = self.players.universities
+        return tuple(
+            descending(keys, counts[name], keep, n) for name in REPEATED_RANKINGS
+        )
+
+    def finalists_by_country(self, first, last, regions, min_finalists):
+        counts = self.cubes.universities_per_country(first, last)
+        keep = counts >= min_finalists
+        keep &= self.cubes.countries.in_regions(self.mask(regions))
+        return ascending(self.cubes.countries.keys, counts, keep)
+
+    def university_rankings(self, first, last, regions):
+        """Universities of every team per year, ranked inside ``regions``."""
+        mask = self.mask(regions)
+        return {
+            str(year): [t.university for t in self.dataset.teams_in_regions(year, mask)]
+            for year in self.periods(first, last)
+        }
+
+    def university_tables(self, first, last, regions, min_parts):
+        """Places and medals per university, best first.
+
+        When no university reaches ``min_parts`` every one is kept.
+        """
+        table = placement_table(self.university_rankings(first, last, regions))
+        kept = table[table["Participaciones"] >= min_parts]
+        if len(kept):
+            table = kept
+        places = table.sort_values(
+            by=PLACE_COLUMNS + ["Total", "Participaciones"], ascending=False
+        )
+        medals = medal_table(table).sort_values(
+            by=["Oro", "Plata", "Bronce", "Total"], ascending=False
+        )
+        return places, medals
+
+    def country_tables(self, first, last, regions, min_parts):
+        """Places and medals per country, best first."""
+        places, medals = country_tables(
+            self.dataset, first, last, self.mask(regions), min_parts
+        )
+        places = places.sort_values(
+            by=PLACE_COLUMNS + ["Total", "Participaciones"], ascending=False
+        )
+        medals = medals.sort_values(
+            by=["Oro", "Plata", "Bronce", "Total", "Participaciones"], ascending=False
+        )
+        return places, medals
+
+
+def year_aggregates(year, teams, problems, universities, regions):
+    """Cube counters, rank rows, solved histogram and player rows of the
+    ``YearTeams`` of ``year``, numpy arrays only.
+    """
+    return (
+        year_counts(teams, problems, universities),
+        year_rows(teams),
+        year_histogram(teams, regions),
+        year_players(teams, year),
+    )
+
+
+def merge_engine(dataset, aggregates):
+    """Engine of the ``year_aggregates`` of every year of ``dataset``."""
+    years = dataset.years
+    names = dataset.identities.names
+    counts, rows, histograms, players = (
+        zip(*aggregates) if aggregates else ((), (), (), ())
+    )
+    return Engine(
+        dataset,
+        merge_cubes(years, names, dataset.country_keys, counts),
+        merge_player_index(names, players, Appearances(dataset.contests, years)),
+        merge_rank_grid(years, names, rows),
+        merge_solved_histogram(years, len(dataset.region_keys), histograms),
+    )
+
+
+def build_engine(dataset):
+    """Engine of ``dataset``, its years aggregated one after the other."""
+    aggregates = [
+        year_aggregates(
+            year,
+            teams,
+            year_problems(dataset, year),
+            len(dataset.identities.names),
+            len(dataset.region_keys),
+        )
+        for year, teams in zip(dataset.years, dataset.columns())
+    ]
+    return merge_engine(dataset, aggregates)
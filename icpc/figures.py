@@ -0,0 +1,177 @@
+"""Plotly figures of the sections, built from the engine results.
+
+Every figure takes the engine first and the parameters of its section, so
+``python -m icpc views`` stores the ones of the default parameters and the
+app builds the others. Figures are shared once built, they must not be
+changed.
+"""
+
+import plotly.graph_objects as go
+
+from . import profiling
+from .engine import SOLVED_STATS
+
+# Above this many points a scatter trace is drawn with WebGL.
+WEBGL_POINTS = 1000
+
+# Line and fill colors of the quartile bands, the best one first.
+BAND_COLORS = ("130, 200, 254", "0, 101, 195", "255, 171, 171", "250, 42, 42")
+
+
+def scatter(x, y, **kwargs):
+    trace = go.Scattergl if len(x) > WEBGL_POINTS else go.Scatter
+    return trace(x=x, y=y, **kwargs)
+
+
+def bar_figure(x, y, height, reverse=False):
+    """Horizontal bars, at least ``height`` pixels tall."""
+    fig = go.Figure(go.Bar(x=x, y=y, orientation="h"))
+    fig.update_layout(
+        margin={"t": 0, "l": 0},
+        height=height if height > 18 * len(x) else 18 * len(x),
+    )
+    if reverse:
+        fig.update_yaxes(autorange="reversed")
+    return fig
+
+
+def ranked_figure(ranking, height):
+    return bar_figure(
+        ranking.tolist(), ranking.index.tolist(), height, reverse=True
+    )
+
+
+def university_markers(table):
+    # A single trace for every university, one per university would not scale.
+    values = table.stack().dropna()
+    return scatter(
+        values.index.get_level_values(0).tolist(),
+        values.tolist(),
+        text=values.index.get_level_values(1).tolist(),
+        name="Universidades",
+        mode="markers",
+        marker=dict(size=6),
+        hovertemplate="%{text}<br>%{x}: %{y}<extra></extra>",
+    )
+
+
+def band_traces(years, bands):
+    return [
+        scatter(
+            years,
+            values.tolist(),
+            name=name,
+            mode="lines",
+            fill="tonexty",
+            fillcolor=f"rgba({color}, 0.5)",
+            line=dict(color=f"rgba({color}, 1)"),
+        )
+        for (name, values), color in bands
+    ]
+
+
+def team_markers(years, table, everything):
+    if everything:
+        return [university_markers(table)]
+    return [
+        scatter(years, v.tolist(), name=u, mode="markers", marker=dict(size=15))
+        for u, v in table.items()
+    ]
+
+
+def country_figure(engine, first, last, regions, min_parts):
+    with profiling.span("agregación"):
+        counts = engine.country_participations(first, last, regions, min_parts)
+    with profiling.span("figuras"):
+        return bar_figure(counts.tolist(), counts.index.tolist(), 450)
+
+
+def university_figure(engine, first, last, regions, min_parts):
+    with profiling.span("agregación"):
+        counts = engine.university_participations(first, last, regions, min_parts)
+    with profiling.span("figuras"):
+        return bar_figure(counts.tolist(), counts.index.tolist(), 700)
+
+
+def finalists_figure(engine, first, last, regions, min_finalists):
+    with profiling.span("agregación"):
+        counts = engine.finalists_by_country(first, last, regions, min_finalists)
+    with profiling.span("figuras"):
+        return bar_figure(counts.tolist(), counts.index.tolist(), 700)
+
+
+def solved_figure(engine, first, last, regions, universities):
+    with profiling.span("agregación"):
+        stats = engine.solved_stats(first, last, regions)
+        solved = engine.solved_by_university(first, last, universities)
+    with profiling.span("figuras"):
+        years = list(range(first, last + 1))
+        fig = go.Figure(
+            [
+                scatter(years, stats[name].tolist(), name=name, mode="lines+markers")
+                for name in SOLVED_STATS
+            ]
+            + [go.Bar(x=years, y=s.tolist(), name=u) for u, s in solved.items()]
+        )
+        fig.update_xaxes(showgrid=True, dtick=1)
+        fig.update_layout(
+            legend=dict(orientation="h"),
+            margin={"t": 0, "l": 0},
+            xaxis_title="Ediciones",
+            yaxis_title="Problemas resueltos",
+        )
+    return fig
+
+
+def place_figures(engine, first, last, regions, universities, everything):
+    """Place and solved figures of the bands, the solved one None without
+    regions. ``everything`` draws every university as a single trace.
+    """
+    with profiling.span("agregación"):
+        place, solved, _ = engine.best_teams(first, last, regions, universities)
+        place_bands = engine.place_bands(first, last, regions)
+        solved_bands = engine.solved_bands(first, last, regions) if regions else None
+    with profiling.span("figuras"):
+        years = list(range(first, last + 1))
+        bands = zip(place_bands.items(), BAND_COLORS)
+        po_fig = go.Figure(
+            band_traces(years, bands) + team_markers(years, place, everything)
+        )
+        po_fig.update_xaxes(showgrid=True, dtick=1)
+        po_fig.update_yaxes(autorange="reversed")
+        po_fig.update_layout(
+            legend=dict(orientation="h"),
+            margin={"t": 0, "l": 0},
+            xaxis_title="Ediciones",
+            yaxis_title="Lugar",
+        )
+        if solved_bands is None:
+            return po_fig, None
+
+        bands = zip(solved_bands.items(), BAND_COLORS)
+        ps_fig = go.Figure(
+            band_traces(years, reversed(list(bands)))
+            + team_markers(years, solved, everything)
+        )
+        ps_fig.update_xaxes(showgrid=True, dtick=1)
+        ps_fig.update_layout(
+            legend=dict(orientation="h"),
+            margin={"t": 0, "l": 0},
+            xaxis_title="Ediciones",
+            yaxis_title="Problemas resueltos",
+        )
+    return po_fig, ps_fig
+
+
+def accumulated_figures(engine, first, last, regions, amount):
+    with profiling.span("agregación"):
+        rankings = engine.top_accumulated(first, last, regions, amount)
+    with profiling.span("figuras"):
+        return tuple(ranked_figure(ranking, 600) for ranking in rankings)
+
+
+def team_figures(engine, first, last, regions, amount):
+    with profiling.span("agregación"):
+        rankings = engine.top_repeated(first, last, regions, amount)
+    with profiling.span("figuras"):
+        return tuple(ranked_figure(ranking, 400) for ranking in rankings)
@@ -0,0 +1,52 @@
+"""Participation sequence graphs, laid out by Graphviz into SVG."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import graphviz as gv
+
+
+def university_graph(index, university, first, last):
+    """Editions from ``first`` to ``last``, linked by the players they share."""
+    editions = set(index.university_years.get(university, []))
+    g1 = gv.Digraph("sequence-parent")
+    c1 = gv.Digraph("sequence-child")
+    c1.attr(rank="same")
+    for y in range(first, last + 1):
+        if y not in editions:
+            c1.node(str(y), shape="square")
+        else:
+            c1.node(str(y), shape="square", style="filled", fillcolor="#40e0d0")
+    for y in range(first + 1, last + 1):
+        c1.edge(str(y - 1), str(y), style="invis")
+    for (y1, y2), shared in index.overlap_edges(university, first, last).items():
+        c1.edge(str(y1), str(y2), label=str(shared))
+    g1.subgraph(c1)
+    return g1
+
+
+def render_svg(graph):
+    """Run the Graphviz layout, raises ``gv.ExecutableNotFound`` without ``dot``."""
+    return graph.pipe(format="svg").decode("utf-8")
+
+
+def _render(index, university, first, last):
+    return render_svg(university_graph(index, university, first, last))
+
+
+def render_all(index, first, last, workers=None, priority=()):
+    """Start rendering every university in a thread pool.
+
+    ``dot`` runs as a subprocess, so threads are enough to use several cores.
+    Universities in ``priority`` are queued first. Returns a future per
+    university.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="graphs")
+    queue = [u for u in priority if u in index.university_years]
+    queued = set(queue)
+    queue += [u for u in index.universities if u not in queued]
+    futures = {
+        university: executor.submit(_render, index, university, first, last)
+        for university in queue
+    }
+    executor.shutdown(wait=False)
+    return futures
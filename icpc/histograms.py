@@ -0,0 +1,111 @@
+"""Teams per year, region and solved problems, for the solved statistics.
+
+Solved counts are small integers, so every statistic of a year comes from
+its histogram instead of the list of teams. Column ``b`` counts the teams
+that solved ``b - 1`` problems, column 0 holds the unknown ones, which no
+statistic counts.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+import numpy as np
+
+from .dataset import year_teams
+
+
+class SolvedHistogram(NamedTuple):
+    years: tuple
+    # (year × region × solved + 1) team counts.
+    counts: np.ndarray
+
+    def rows(self, first, last, mask):
+        """Histogram of every year of the range with known solved counts
+        inside ``mask``, column ``s`` counting the teams that solved ``s``.
+        """
+        lo, hi = bisect_left(self.years, first), bisect_right(self.years, last)
+        codes = np.arange(self.counts.shape[1])
+        # Unknown solved counts are no value, they stay out of every statistic.
+        counts = self.counts[lo:hi, (mask >> codes) & 1 == 1, 1:].sum(axis=1)
+        kept = counts.sum(axis=1) > 0
+        return [y for y, k in zip(self.years[lo:hi], kept) if k], counts[kept]
+
+    def stats(self, first, last, mask):
+        """Years with known solved counts and their min, max, mode, rounded
+        median and mean.
+
+        Ties for the mode go to the most solved problems, the first one met
+        in finishing order.
+        """
+        years, counts = self.rows(first, last, mask)
+        values = np.arange(counts.shape[1])
+        teams = counts.sum(axis=1)
+        present = counts > 0
+        last_bin = counts.shape[1] - 1
+        median = (
+            _nth(counts, values, (teams - 1) // 2) + _nth(counts, values, teams // 2)
+        ) / 2
+        return years, (
+            values[present.argmax(axis=1)],
+            values[last_bin - present[:, ::-1].argmax(axis=1)],
+            values[last_bin - counts[:, ::-1].argmax(axis=1)],
+            np.round(median).astype(np.int64),
+            counts @ values / teams,
+        )
+
+    def percentiles(self, first, last, mask, percents):
+        """Years with known solved counts and their percentiles, interpolated
+        like ``numpy.percentile``, one column per percent.
+        """
+        years, counts = self.rows(first, last, mask)
+        values = np.arange(counts.shape[1])
+        teams = counts.sum(axis=1)
+        columns = []
+        for percent in percents:
+            position = (teams - 1) * percent / 100
+            below = np.floor(position).astype(np.int64)
+            low = _nth(counts, values, below)
+            high = _nth(counts, values, np.ceil(position).astype(np.int64))
+            columns.append(low + (high - low) * (position - below))
+        return years, np.column_stack(columns)
+
+
+def _nth(counts, values, k):
+    """Value of the ``k``-th team of every row, smallest first."""
+    return values[(counts.cumsum(axis=1) > k[:, None]).argmax(axis=1)]
+
+
+def year_histogram(teams, regions):
+    """(region × solved + 1) counts of the ``YearTeams`` of a year, as wide as
+    its most solved problems need.
+    """
+    bins = int(teams.solved.max(initial=0)) + 2
+    counts = np.zeros((regions, bins), dtype=np.int64)
+    # UNKNOWN is -1, it falls on the first column.
+    np.add.at(counts, (teams.region, teams.solved + 1), 1)
+    return counts
+
+
+def merge_solved_histogram(years, regions, rows):
+    """Histogram of the ``year_histogram`` rows of every year of ``years``."""
+    bins = max((r.shape[1] for r in rows), default=2)
+    counts = np.zeros((len(years), regions, bins), dtype=np.int64)
+    for row, year_counts in enumerate(rows):
+        counts[row, :, : year_counts.shape[1]] = year_counts
+    return SolvedHistogram(years=tuple(years), counts=counts)
+
+
+def build_solved_histogram(dataset):
+    regions = len(dataset.region_keys)
+    rows = [year_histogram(teams, regions) for teams in dataset.columns()]
+    return merge_solved_histogram(dataset.years, regions, rows)
+
+
+def extend_solved_histogram(histogram, dataset, year):
+    """``histogram`` plus the row of ``year``, which follows all of its years."""
+    rows, regions, bins = histogram.counts.shape
+    added = year_histogram(year_teams(dataset.contests[str(year)], {}), regions)
+    counts = np.zeros((rows + 1, regions, max(bins, added.shape[1])), dtype=np.int64)
+    counts[:rows, :, :bins] = histogram.counts
+    counts[rows, :, : added.shape[1]] = added
+    return SolvedHistogram(years=histogram.years + (year,), counts=counts)
@@ -0,0 +1,86 @@
+"""Compact integer identity of every university, merging its spellings.
+
+The results file writes some universities in more than one way, "Physics &
+Technology" and "Physics and Technology", with and without a leading "The"
+or accents. ``canonical_key`` folds those differences and every spelling
+with the same key gets one id. Letters that do not decompose (ł, ø, ß) and
+other scripts are kept as they are, so different names never share a key.
+Ids follow the first appearance in the contests, so appending a year never
+renumbers the previous ones, and the name kept for an id is its first
+spelling.
+"""
+
+import unicodedata
+from typing import NamedTuple
+
+
+def _is_latin(char):
+    return unicodedata.name(char, "").startswith("LATIN")
+
+
+def canonical_key(name):
+    """Casefolded words of ``name`` without accents, "&" read as "and", no
+    leading "the". Letters of any script are kept, a name without any gives
+    its casefolded self.
+    """
+    kept = []
+    for char in unicodedata.normalize("NFKD", name):
+        # Accents of latin letters go, the marks of other scripts are letters.
+        if unicodedata.combining(char) and kept and _is_latin(kept[-1]):
+            continue
+        kept.append(char)
+    folded = unicodedata.normalize("NFKC", "".join(kept)).casefold()
+    folded = folded.replace("&", " and ")
+    # Letters, digits and the marks left go into words, anything else splits.
+    words = "".join(
+        c if unicodedata.category(c)[0] in "LNM" else " " for c in folded
+    ).split()
+    if words[:1] == ["the"] and len(words) > 1:
+        words = words[1:]
+    return " ".join(words) or name.casefold()
+
+
+class Identities(NamedTuple):
+    # Name of every university id.
+    names: tuple
+    # Every spelling of a university, its canonical key and every team alias
+    # listed under a single university, to its id.
+    ids: dict
+
+    def lookup(self, name):
+        """Id of a university spelling or team alias, None when unknown."""
+        found = self.ids.get(name)
+        if found is None:
+            # New spellings of a known university still resolve.
+            found = self.ids.get(canonical_key(name))
+        return found
+
+
+def build_identities(spellings, aliases=()):
+    """Identities of the universities in ``spellings``, in order of appearance.
+
+    ``aliases`` are (university, team) rows, their team names resolve to the
+    id of the university. Universities listed only there get no id.
+    """
+    names = []
+    ids = {}
+    for spelling in spellings:
+        if spelling in ids:
+            continue
+        key = canonical_key(spelling)
+        if key not in ids:
+            ids[key] = len(names)
+            names.append(spelling)
+        ids[spelling] = ids[key]
+
+    teams = {}
+    for university, team in aliases:
+        found = ids.get(university, ids.get(canonical_key(university)))
+        if found is not None:
+            ids.setdefault(university, found)
+            teams.setdefault(team, set()).add(found)
+    for team, found in teams.items():
+        # A team name listed under two universities identifies neither.
+        if len(found) == 1:
+            ids.setdefault(team, found.pop())
+    return Identities(names=tuple(names), ids=ids)
@@ -0,0 +1,115 @@
+"""Adding the results of a new year without rebuilding the previous ones.
+
+``python -m icpc ingest year.json`` reads a file with the layout of the
+results file holding a single year: ``contests`` with its teams, ``stats``
+with its entry and, optionally, the ``countries`` or university aliases it
+introduces. The year is merged into the results file and appended to its
+snapshot. A running app then extends its engine with that year only.
+"""
+
+import json
+
+from .cubes import extend_cubes
+from .dataset import (
+    DATA_PATH,
+    content_digest,
+    file_digest,
+    parse_dataset,
+    replacing,
+)
+from .engine import Engine
+from .histograms import extend_solved_histogram
+from .players import extend_player_index
+from .precompute import precompute_engine
+from .ranks import extend_rank_grid
+from .snapshot import (
+    alias_rows,
+    append_snapshot,
+    compile_snapshot,
+    extend_dataset,
+    load_snapshot,
+    snapshot_parents,
+    snapshot_path,
+    snapshot_version,
+)
+
+
+def merge_year(data, new):
+    """Add the single year of ``new`` to the results ``data``, returns it."""
+    if len(new["contests"]) != 1:
+        raise ValueError("the file to ingest must hold exactly one year")
+    (year, teams), = new["contests"].items()
+    last = max(int(x) for x in data["contests"])
+    if int(year) <= last:
+        raise ValueError(f"{year} is not after the last year, {last}")
+
+    for country, details in new.get("countries", {}).items():
+        if country not in data["countries"]:
+            data["countries"][country] = details
+            continue
+        known = data["countries"][country].setdefault("universities", {})
+        for university, aliases in details.get("universities", {}).items():
+            names = known.setdefault(university, {"teams": []})["teams"]
+            names.extend(t for t in aliases["teams"] if t not in names)
+
+    unknown = {t["country"] for t in teams} - set(data["countries"])
+    if unknown:
+        raise ValueError(f"unknown countries: {', '.join(sorted(unknown))}")
+
+    data["contests"][year] = teams
+    # The file lists the stats newest first.
+    data["stats"] = {**new.get("stats", {}), **data["stats"]}
+    return int(year)
+
+
+def ingest_year(source, path=DATA_PATH):
+    """Merge the year of ``source`` into ``path`` and its snapshot."""
+    with open(path, "rb") as file:
+        content = file.read()
+    parent = content_digest(content)
+    data = json.loads(content)
+    with open(source, encoding="UTF-8") as file:
+        year = merge_year(data, json.load(file))
+
+    content = json.dumps(data, ensure_ascii=False, indent=4).encode("UTF-8")
+    version = content_digest(content)
+
+    # The snapshot goes first, readers keep the old version until the rename
+    # of the results file.
+    target = snapshot_path(path)
+    if snapshot_version(target) == parent:
+        added = parse_dataset(data, version, years={year})
+        append_snapshot(added, year, target, alias_rows(data["countries"]), parent)
+    else:
+        compile_snapshot(parse_dataset(data, version), target)
+
+    with replacing(path) as tmp:
+        with open(tmp, "wb") as file:
+            file.write(content)
+    return year
+
+
+def extend_engine(engine, dataset):
+    """Engine of ``dataset``, whose first years are those of ``engine``."""
+    cubes, players, ranks, histogram = engine[1:]
+    for year in dataset.years[len(engine.dataset.years) :]:
+        cubes = extend_cubes(cubes, dataset, year)
+        players = extend_player_index(players, dataset, year)
+        ranks = extend_rank_grid(ranks, dataset, year)
+        histogram = extend_solved_histogram(histogram, dataset, year)
+    return Engine(dataset, cubes, players, ranks, histogram)
+
+
+def refresh(engine, path=DATA_PATH):
+    """Engine of the current ``path``, extending ``engine`` when possible."""
+    version = file_digest(path)
+    if engine is not None and engine.dataset.version == version:
+        return engine
+    target = snapshot_path(path)
+    if (
+        engine is not None
+        and snapshot_version(target) == version
+        and engine.dataset.version in snapshot_parents(target)
+    ):
+        return extend_engine(engine, extend_dataset(engine.dataset, target))
+    return precompute_engine(load_snapshot(path), target=target)
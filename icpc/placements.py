@@ -0,0 +1,78 @@
+"""University x place histograms for the position and medal tables."""
+
+import numpy as np
+import pandas as pd
+
+PLACES = 12
+PLACE_COLUMNS = [f"{x}º" for x in range(1, PLACES + 1)]
+MEDALS = {"Oro": (0, 4), "Plata": (4, 8), "Bronce": (8, 12)}
+
+
+def placement_table(rankings, places=PLACES, per_year=False, name="Universidades"):
+    """Count how many times each entity finished in each of the first places.
+
+    ``rankings`` maps a year to its entities in finishing order. The result
+    has one row per entity seen, the ``places`` counts, their ``Total`` and
+    the number of ``Participaciones``: entries, or distinct years when
+    ``per_year`` is set.
+    """
+    names = []
+    ranks = []
+    years = []
+    for row, ranking in enumerate(rankings.values()):
+        names.extend(ranking)
+        ranks.append(np.arange(len(ranking)))
+        years.append(np.full(len(ranking), row))
+    codes, keys = pd.factorize(pd.Series(names, dtype=object))
+    ranks = np.concatenate(ranks) if ranks else np.zeros(0, dtype=np.int64)
+
+    n = len(keys)
+    top = ranks < places
+    counts = np.bincount(
+        codes[top] * places + ranks[top], minlength=n * places
+    ).reshape(n, places)
+
+    table = pd.DataFrame(
+        counts,
+        index=pd.Index(keys, name=name),
+        columns=[f"{x}º" for x in range(1, places + 1)],
+    )
+    table["Total"] = counts.sum(axis=1)
+    if per_year and n:
+        years = np.concatenate(years)
+        pairs = np.unique(codes * len(rankings) + years)
+        table["Participaciones"] = np.bincount(pairs // len(rankings), minlength=n)
+    else:
+        table["Participaciones"] = np.bincount(codes, minlength=n)
+    return table
+
+
+def country_rankings(dataset, first, last, mask):
+    """Countries of every team per year, ranked inside the ``mask`` regions."""
+    return {
+        year: [team.country for team in dataset.teams_in_regions(year, mask)]
+        for year in dataset.years
+        if first <= year <= last
+    }
+
+
+def country_tables(dataset, first, last, mask, min_parts=1):
+    """Detailed places and medal summary per country, from a single pass."""
+    table = placement_table(
+        country_rankings(dataset, first, last, mask),
+        per_year=True,
+        name="País",
+    )
+    table = table[table["Participaciones"] >= min_parts]
+    return table, medal_table(table)
+
+
+def medal_table(table):
+    counts = table[PLACE_COLUMNS].to_numpy()
+    medals = pd.DataFrame(
+        {name: counts[:, lo:hi].sum(axis=1) for name, (lo, hi) in MEDALS.items()},
+        index=table.index,
+    )
+    medals["Total"] = medals.sum(axis=1)
+    medals["Participaciones"] = table["Participaciones"]
+    return medals
@@ -0,0 +1,304 @@
+"""Inverted index from players to the teams they were part of."""
+
+import itertools
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Appearance(NamedTuple):
+    year: int
+    university: str
+    team: str
+
+
+class PlayerIndex(NamedTuple):
+    appearances: Mapping
+    universities: tuple
+    university_regions: np.ndarray
+    university_years: dict
+    overlaps: dict
+    # One entry per (team, player), in contest order.
+    player_year: np.ndarray
+    player_university: np.ndarray
+    player_team: np.ndarray
+    previous_year: np.ndarray
+    # One entry per team.
+    team_year: np.ndarray
+    team_university: np.ndarray
+
+    def repeat_stats(self, first, last, mask):
+        """Per university counters of the teams between ``first`` and ``last``.
+
+        A player is repeated when they already were in a team of the same
+        university in an earlier edition of the range.
+        """
+        n = len(self.universities)
+        selected = (mask >> self.university_regions) & 1 == 1
+
+        in_range = (self.team_year >= first) & (self.team_year <= last)
+        in_range &= selected[self.team_university]
+
+        seen = (self.player_year >= first) & (self.player_year <= last)
+        seen &= selected[self.player_university]
+        repeated = seen & (self.previous_year >= first)
+
+        repeated_teams = np.unique(self.player_team[repeated])
+        return {
+            "teams": np.bincount(self.team_university[in_range], minlength=n),
+            "players": np.bincount(
+                self.player_university[seen & ~repeated], minlength=n
+            ),
+            "repeated": np.bincount(
+                self.team_university[repeated_teams], minlength=n
+            ),
+            "repeated_players": np.bincount(
+                self.player_university[repeated], minlength=n
+            ),
+        }
+
+    def overlap_edges(self, university, first, last):
+        """Pairs of editions of ``university`` with the players they share."""
+        # Sorted, so every way of building the index draws the same graph.
+        return {
+            (y1, y2): count
+            for (y1, y2), count in sorted(self.overlaps.get(university, {}).items())
+            if first <= y1 and y2 <= last
+        }
+
+
+class Appearances(Mapping):
+    """Player to their appearances, in contest order.
+
+    Built from the teams of ``contests`` the first time it is read, nothing
+    else in the index needs the names.
+    """
+
+    def __init__(self, contests, years, built=None):
+        self._contests = contests
+        self._years = tuple(years)
+        self._built = built
+
+    def _index(self):
+        if self._built is None:
+            built = defaultdict(list)
+            for year in self._years:
+                for team in self._contests[str(year)]:
+                    appearance = Appearance(year, team.university, team.team)
+                    for player in team.players:
+                        built[player].append(appearance)
+            self._built = dict(built)
+        return self._built
+
+    def __getitem__(self, player):
+        return self._index()[player]
+
+    def __iter__(self):
+        return iter(self._index())
+
+    def __len__(self):
+        return len(self._index())
+
+
+class YearPlayers(NamedTuple):
+    """Teams and players of a single year, merged into the index in year order."""
+
+    year: int
+    # University id and region code of every team.
+    team_university: np.ndarray
+    team_region: np.ndarray
+    # One entry per (team, player), the team is its row in the year.
+    player: np.ndarray
+    player_university: np.ndarray
+    player_team: np.ndarray
+
+
+def year_players(teams, year):
+    """Teams and players of the ``YearTeams`` of ``year``."""
+    return YearPlayers(
+        year=year,
+        team_university=teams.university,
+        team_region=teams.region,
+        player=teams.player,
+        player_university=teams.university[teams.player_team],
+        player_team=teams.player_team,
+    )
+
+
+def _concatenate(arrays):
+    return np.concatenate([np.zeros(0, dtype=np.int64)] + list(arrays))
+
+
+def merge_player_index(universities, years, appearances):
+    """Index of the ``year_players`` of every year, in year order.
+
+    Player codes must be the same for a name in every year. Previous
+    editions and shared players come from one sort of the (player,
+    university) pairs instead of a walk over the contests.
+    """
+    team_university = _concatenate(y.team_university for y in years)
+    team_region = _concatenate(y.team_region for y in years)
+    team_year = _concatenate(
+        np.full(len(y.team_university), y.year, dtype=np.int64) for y in years
+    )
+    # The first team of a university gives its region.
+    university_regions = np.full(len(universities), -1, dtype=np.int64)
+    first_teams, first = np.unique(team_university, return_index=True)
+    university_regions[first_teams] = team_region[first]
+    span = int(team_year.max(initial=0)) + 1
+    editions, _ = _distinct(team_university * span + team_year)
+    university_years = {
+        universities[u]: (editions[start:stop] % span).tolist()
+        for u, start, stop in _groups(editions // span)
+    }
+
+    offsets = np.cumsum([0] + [len(y.team_university) for y in years])
+    player_team = _concatenate(y.player_team + o for y, o in zip(years, offsets))
+    player_university = _concatenate(y.player_university for y in years)
+    player_year = team_year[player_team]
+    # One key per (player, university), rows keep the contest order.
+    key = _concatenate(y.player for y in years) * (len(universities) + 1)
+    key += player_university
+
+    order = np.argsort(key, kind="stable")
+    same = key[order[1:]] == key[order[:-1]]
+    previous_year = np.full(len(key), -1, dtype=np.int64)
+    previous_year[order[1:][same]] = player_year[order[:-1][same]]
+
+    return PlayerIndex(
+        appearances=appearances,
+        universities=universities,
+        university_regions=university_regions,
+        university_years=university_years,
+        overlaps=_overlaps(universities, key, player_year),
+        player_year=player_year,
+        player_university=player_university,
+        player_team=player_team,
+        previous_year=previous_year,
+        team_year=team_year,
+        team_university=team_university,
+    )
+
+
+def _distinct(values):
+    """Sorted distinct ``values`` and their counts, sorting is faster than
+    the hashing of ``np.unique`` here.
+    """
+    values = np.sort(values)
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]][: len(values)])
+    return values[starts], np.diff(np.r_[starts, len(values)])
+
+
+def _groups(values):
+    """(value, start, stop) of every run of equal sorted ``values``."""
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]][: len(values)])
+    stops = np.r_[starts[1:], len(values)]
+    return zip(values[starts].tolist(), starts.tolist(), stops.tolist())
+
+
+def _overlaps(universities, key, player_year):
+    """Players shared by every pair of editions of every university."""
+    n = len(universities) + 1
+    span = int(player_year.max(initial=0)) + 1
+    careers, _ = _distinct(key * span + player_year)
+    key, year = careers // span, careers % span
+    pairs = []
+    # The d-th next edition of the same career, while there is any.
+    for d in range(1, len(careers)):
+        same = key[d:] == key[:-d]
+        if not same.any():
+            break
+        u = key[d:][same] % n
+        pairs.append((u * span + year[:-d][same]) * span + year[d:][same])
+    edges, counts = _distinct(_concatenate(pairs))
+    rest, y2 = np.divmod(edges, span)
+    u, y1 = np.divmod(rest, span)
+    shared = zip(zip(y1.tolist(), y2.tolist()), counts.tolist())
+    # Edges are sorted by university, each takes the next run of them.
+    return {
+        universities[university]: dict(itertools.islice(shared, stop - start))
+        for university, start, stop in _groups(u)
+    }
+
+
+def build_player_index(dataset):
+    return merge_player_index(
+        dataset.identities.names,
+        [year_players(t, y) for y, t in zip(dataset.years, dataset.columns())],
+        Appearances(dataset.contests, dataset.years),
+    )
+
+
+def _grown(old, new):
+    return np.concatenate([old, np.array(new, dtype=np.int64)])
+
+
+def extend_player_index(index, dataset, year):
+    """``index`` plus the teams of ``year``, which follows all of its years.
+
+    Lists and dicts of ``index`` are copied before they change, so it keeps
+    answering for the data it was built from.
+    """
+    appearances = dict(index.appearances)
+    universities = dataset.identities.names
+    university_regions = index.university_regions.tolist()
+    university_regions += [-1] * (len(universities) - len(university_regions))
+    university_years = dict(index.university_years)
+    overlaps = dict(index.overlaps)
+    copied = set()
+
+    player_year = []
+    player_university = []
+    player_team = []
+    previous_year = []
+    team_year = []
+    team_university = []
+
+    row = len(index.team_year)
+    for team in dataset.contests[str(year)]:
+        u = team.university_id
+        if university_regions[u] < 0:
+            university_regions[u] = team.region_code
+        editions = university_years.get(team.university, [])
+        if not editions or editions[-1] != year:
+            university_years[team.university] = editions + [year]
+
+        team_year.append(year)
+        team_university.append(u)
+
+        appearance = Appearance(year, team.university, team.team)
+        for player in team.players:
+            history = appearances.get(player, [])
+            career = [a.year for a in history if a.university == team.university]
+            appearances[player] = history + [appearance]
+            player_year.append(year)
+            player_university.append(u)
+            player_team.append(row)
+            previous_year.append(career[-1] if career else -1)
+            if year in career:
+                continue
+            for earlier in sorted(set(career)):
+                if team.university not in copied:
+                    copied.add(team.university)
+                    overlaps[team.university] = dict(
+                        overlaps.get(team.university, {})
+                    )
+                edges = overlaps[team.university]
+                edges[(earlier, year)] = edges.get((earlier, year), 0) + 1
+        row += 1
+
+    return PlayerIndex(
+        appearances=Appearances(dataset.contests, dataset.years, appearances),
+        universities=universities,
+        university_regions=np.array(university_regions, dtype=np.int64),
+        university_years=university_years,
+        overlaps=overlaps,
+        player_year=_grown(index.player_year, player_year),
+        player_university=_grown(index.player_university, player_university),
+        player_team=_grown(index.player_team, player_team),
+        previous_year=_grown(index.previous_year, previous_year),
+        team_year=_grown(index.team_year, team_year),
+        team_university=_grown(index.team_university, team_university),
+    )
@@ -0,0 +1,66 @@
+"""Engine aggregates of every year computed by a pool of worker processes.
+
+The cube counters, rank rows, solved histogram and player rows of a year
+only depend on its own teams, so every year is sent to a worker. A worker
+gets the path of the snapshot and a year, reads the columns of that year
+from the memory map and sends back numpy arrays only; no team is pickled
+either way. Results are merged in year order whatever order they finish
+in, the engine is the same one ``build_engine`` gives.
+
+Workers start from a fresh ``forkserver`` process: the app forks from a
+process with running threads, which a plain fork can leave deadlocked.
+
+``ICPC_WORKERS`` sets the size of the pool, 1 (the default) aggregates the
+snapshot here without a pool.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .cubes import year_problems
+from .engine import build_engine, merge_engine, year_aggregates
+from .snapshot import read_year_teams, snapshot_version
+
+WORKERS = int(os.environ.get("ICPC_WORKERS") or 1)
+
+
+def snapshot_aggregates(target, year, problems, universities, regions):
+    """``year_aggregates`` of the ``year`` rows of the snapshot ``target``."""
+    teams = read_year_teams(target, year)
+    return year_aggregates(year, teams, problems, universities, regions)
+
+
+def _context():
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # Workers fork from a server that already imported numpy and pyarrow.
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def precompute_engine(dataset, workers=WORKERS, target=None):
+    """Engine of ``dataset``, its years aggregated by ``workers`` processes
+    from the snapshot ``target``.
+
+    Without a snapshot of the same version the teams of ``dataset`` are
+    aggregated here.
+    """
+    if target is None or snapshot_version(target) != dataset.version:
+        return build_engine(dataset)
+
+    years = dataset.years
+    arguments = (
+        [target] * len(years),
+        years,
+        [year_problems(dataset, year) for year in years],
+        [len(dataset.identities.names)] * len(years),
+        [len(dataset.region_keys)] * len(years),
+    )
+    if workers <= 1:
+        return merge_engine(dataset, list(map(snapshot_aggregates, *arguments)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_context()) as executor:
+        # map yields in the order of the years, whichever finished first.
+        aggregates = list(executor.map(snapshot_aggregates, *arguments))
+    return merge_engine(dataset, aggregates)
@@ -0,0 +1,202 @@
+"""Wall time, memory peak and cache counters of the app sections.
+
+A ``Profiler`` belongs to one session. While it is ``active``, every ``span``
+records how long its block took and the tracemalloc peak above the memory in
+use when it started, and every record is logged as a JSON line on the
+``icpc.profile`` logger. Spans nest, the outermost one is the section.
+
+tracemalloc is shared by the whole process. It only traces while a span of
+any session runs, so a session that goes away leaves nothing on, and the
+peak reached so far is handed to every running span before a new one resets
+it. Spans of sessions running at the same time count each other's memory.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+
+logger = logging.getLogger("icpc.profile")
+
+_active = contextvars.ContextVar("icpc_profiler", default=None)
+# Spans running in every session, tracemalloc traces while there is any.
+_lock = threading.Lock()
+_running = []
+# Whether the spans started tracemalloc, a benchmark may have done it.
+_started = False
+# Last definition of every ``counted_cache`` function, by name.
+_counted = {}
+
+
+class _Frame:
+    __slots__ = ("name", "start", "base", "peak", "calls", "misses")
+
+    def __init__(self, name, base):
+        self.name = name
+        self.start = time.perf_counter()
+        self.base = base
+        self.peak = base
+        self.calls = Counter()
+        self.misses = Counter()
+
+
+class Profiler:
+    """Spans of one session, the last ``keep`` records are kept."""
+
+    def __init__(self, keep=500):
+        self.session = uuid.uuid4().hex[:8]
+        self.records = deque(maxlen=keep)
+        self.runs = Counter()
+        self._stack = []
+
+    @contextmanager
+    def span(self, name):
+        if not self._stack:
+            self.runs[name] += 1
+        frame = _enter(name)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - frame.start
+            _leave(frame)
+            self._stack.pop()
+            self._record(frame, wall)
+
+    def _record(self, frame, wall):
+        names = [f.name for f in self._stack] + [frame.name]
+        record = {
+            "session": self.session,
+            "section": names[0],
+            "span": " / ".join(names),
+            "run": self.runs[names[0]],
+            "wall_ms": round(wall * 1000, 2),
+            "peak_kib": round((frame.peak - frame.base) / 1024),
+        }
+        if not self._stack:
+            record["hits"] = dict(frame.calls - frame.misses)
+            record["misses"] = dict(frame.misses)
+        self.records.append(record)
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+    def count(self, function, miss=False):
+        """Count a cached call in the section running it."""
+        if self._stack:
+            counter = self._stack[0].misses if miss else self._stack[0].calls
+            counter[function] += 1
+
+    def latest(self):
+        """The last record of every span, in first seen order."""
+        latest = {}
+        for record in self.records:
+            latest[record["span"]] = record
+        return list(latest.values())
+
+
+def _fold():
+    """Raise the peak of every running span to the one traced so far."""
+    peak = tracemalloc.get_traced_memory()[1]
+    for frame in _running:
+        frame.peak = max(frame.peak, peak)
+
+
+def _enter(name):
+    global _started
+    with _lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started = True
+        _fold()
+        # The peak is reset for the new span, the running ones keep theirs.
+        tracemalloc.reset_peak()
+        frame = _Frame(name, tracemalloc.get_traced_memory()[0])
+        _running.append(frame)
+    return frame
+
+
+def _leave(frame):
+    global _started
+    with _lock:
+        if tracemalloc.is_tracing():
+            _fold()
+        _running.remove(frame)
+        if not _running and _started:
+            tracemalloc.stop()
+            _started = False
+
+
+@contextmanager
+def active(profiler):
+    """Make ``profiler`` the one ``span`` and the cache counters report to."""
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def span(name):
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.span(name):
+        yield
+
+
+def count(name, miss=False):
+    """Count a cached call on the active profiler, if any."""
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.count(name, miss)
+
+
+def counted_cache(cache, **options):
+    """``cache(**options)`` decorator that also counts its hits and misses.
+
+    Calls run through the cache, the inner function only on a miss.
+    """
+
+    def decorate(function):
+        name = function.__name__
+
+        @functools.wraps(function)
+        def miss(*args, **kwargs):
+            count(name, miss=True)
+            return function(*args, **kwargs)
+
+        cached = cache(**options)(miss)
+
+        @functools.wraps(function)
+        def call(*args, **kwargs):
+            count(name)
+            return cached(*args, **kwargs)
+
+        call.clear = cached.clear
+        _counted[name] = call
+        return call
+
+    return decorate
+
+
+def clear_counted():
+    """Empty the caches of every ``counted_cache`` function, for benchmarks."""
+    for call in list(_counted.values()):
+        call.clear()
+
+
+def log_to_stderr():
+    """Print the JSON lines even when the logging is not configured."""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
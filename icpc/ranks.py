@@ -0,0 +1,155 @@
+"""Teams of every year as a (year × team) grid, for batched quantiles.
+
+Row ``i`` holds the teams of ``years[i]`` in contest order, padded to the
+largest year. A region filter turns into a boolean grid whose running sum
+along the row is the place inside those regions, so the bands of every year
+and the places of any number of universities come out of a few array
+operations.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+import numpy as np
+
+from .dataset import UNKNOWN, year_teams
+
+# Spanish name of the band when a year is split in that many parts.
+BAND_NAMES = {4: "Cuartil", 10: "Decil", 100: "Percentil"}
+
+# Region code of the padding, outside any mask.
+PADDING = -1
+
+
+def band_names(parts):
+    name = BAND_NAMES.get(parts)
+    if name is None:
+        return [f"{k}/{parts}" for k in range(1, parts + 1)]
+    return [f"{name} {k}" for k in range(1, parts + 1)]
+
+
+class RankGrid(NamedTuple):
+    years: tuple
+    universities: tuple
+    # (year × team) arrays, PADDING past the last team of a year.
+    university: np.ndarray
+    solved: np.ndarray
+    regions: np.ndarray
+
+    def rows(self, first, last):
+        return bisect_left(self.years, first), bisect_right(self.years, last)
+
+    def selected(self, first, last, mask):
+        """Rows of the period and the teams of each inside ``mask``."""
+        lo, hi = self.rows(first, last)
+        regions = self.regions[lo:hi]
+        inside = (mask >> np.maximum(regions, 0)) & 1 == 1
+        return lo, hi, inside & (regions != PADDING)
+
+    def _frame(self, lo, hi, first, last, values):
+        # One row per year of the range, years without contest are empty.
+        table = np.full((last - first + 1,) + values.shape[1:], np.nan)
+        table[np.array(self.years[lo:hi], dtype=np.int64) - first] = values
+        return table
+
+    def team_counts(self, first, last, mask):
+        """Teams ranked inside ``mask``, one per year of the range."""
+        lo, hi, selected = self.selected(first, last, mask)
+        counts = self._frame(lo, hi, first, last, selected.sum(axis=1))
+        return np.nan_to_num(counts).astype(np.int64)
+
+    def place_bands(self, first, last, mask, parts):
+        """Last place of every band, ``parts`` columns per year."""
+        counts = self.team_counts(first, last, mask)
+        k = np.arange(1, parts + 1)
+        return (counts[:, None] * k // parts).astype(np.int64)
+
+    def solved_bands(self, first, last, mask, parts):
+        """Solved problems of the first team of every band.
+
+        Years without teams inside ``mask`` are left empty.
+        """
+        lo, hi, selected = self.selected(first, last, mask)
+        counts = selected.sum(axis=1)
+        # Teams outside the mask sink to the end of the descending order.
+        solved = np.where(selected, self.solved[lo:hi], np.iinfo(np.int64).min)
+        ordered = np.sort(solved, axis=1)[:, ::-1]
+        start = counts[:, None] * np.arange(parts) // parts
+        start = np.minimum(start, ordered.shape[1] - 1)
+        bands = np.take_along_axis(ordered, start, axis=1)
+        bands = np.where(counts[:, None] > 0, bands, np.nan)
+        return self._frame(lo, hi, first, last, bands)
+
+    def best_places(self, first, last, mask, ids):
+        """Place inside ``mask`` and solved problems of the best team of every
+        university id, as (year × university) arrays in the given order.
+
+        Ids that are None give empty columns.
+        """
+        lo, hi, selected = self.selected(first, last, mask)
+        columns = np.full(len(self.universities) + 1, -1, dtype=np.int64)
+        for column, university in enumerate(ids):
+            if university is not None:
+                columns[university] = column
+        places = np.cumsum(selected, axis=1)
+
+        # The padding points to the extra slot, which maps to no column.
+        found = columns[self.university[lo:hi]]
+        row, team = np.nonzero(selected & (found >= 0))
+        # The first team of a university in a year is its best one.
+        keys = row * len(ids) + found[row, team]
+        keys, first_seen = np.unique(keys, return_index=True)
+        row, team = row[first_seen], team[first_seen]
+
+        shape = (hi - lo, len(ids))
+        place = np.full(shape, np.nan)
+        solved = np.full(shape, np.nan)
+        place.flat[keys] = places[row, team]
+        solved.flat[keys] = self.solved[lo + row, team]
+        return (
+            self._frame(lo, hi, first, last, place),
+            self._frame(lo, hi, first, last, solved),
+        )
+
+
+def _grid(rows, width, fill):
+    grid = np.full((len(rows), width), fill, dtype=np.int64)
+    for i, row in enumerate(rows):
+        grid[i, : len(row)] = row
+    return grid
+
+
+def year_rows(teams):
+    """University ids, solved problems and region codes of the ``YearTeams``."""
+    return teams.university, teams.solved, teams.region
+
+
+def merge_rank_grid(years, universities, rows):
+    """Grid of the ``year_rows`` of every year of ``years``."""
+    width = max((len(r[0]) for r in rows), default=0)
+    # The padding university is the extra slot after the real ones.
+    return RankGrid(
+        years=tuple(years),
+        universities=universities,
+        university=_grid([r[0] for r in rows], width, len(universities)),
+        solved=_grid([r[1] for r in rows], width, UNKNOWN),
+        regions=_grid([r[2] for r in rows], width, PADDING),
+    )
+
+
+def build_rank_grid(dataset):
+    rows = [year_rows(teams) for teams in dataset.columns()]
+    return merge_rank_grid(dataset.years, dataset.identities.names, rows)
+
+
+def extend_rank_grid(grid, dataset, year):
+    """``grid`` plus the row of ``year``, which follows all of its years."""
+    rows = []
+    for universities, solved, regions in zip(
+        grid.university, grid.solved, grid.regions
+    ):
+        # The padding is dropped, the new grid may be wider.
+        n = np.count_nonzero(regions != PADDING)
+        rows.append((universities[:n], solved[:n], regions[:n]))
+    rows.append(year_rows(year_teams(dataset.contests[str(year)], {})))
+    return merge_rank_grid(grid.years + (year,), dataset.identities.names, rows)
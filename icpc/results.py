@@ -0,0 +1,280 @@
+"""Results of the sections shared on disk by every server process.
+
+A ``ResultCache`` is a SQLite file next to the data file. Every entry is a
+pickled table or figure keyed by its section, its parameters, the data
+version and the version of the code, so a view computed by one process is
+read back by the others and survives restarts, but not a deploy. The least
+recently used entries go once the file holds more than ``max_bytes`` of
+results. Hits and misses of every section are counted in the same file.
+
+Reads only read. Their last use times and counters are written in batches,
+with the next result stored or every ``FLUSH_INTERVAL`` seconds.
+"""
+
+import atexit
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from . import profiling
+from .dataset import DATA_PATH
+
+# Bytes of pickled results kept before evicting the least recently used.
+MAX_BYTES = 256 * 2**20
+
+# Layout of the stored results, raise it when they change in a way the
+# source files do not show.
+CACHE_FORMAT = "1"
+
+# Seconds the use times and counters of reads wait to be written.
+FLUSH_INTERVAL = 5.0
+
+PACKAGE = os.path.dirname(os.path.abspath(__file__))
+
+log = logging.getLogger(__name__)
+
+# Failures of the file, which only turn the cache off.
+_ERRORS = (sqlite3.Error, OSError, pickle.PickleError)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    section TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+CREATE TABLE IF NOT EXISTS counters (
+    section TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def results_path(path=DATA_PATH):
+    return os.environ.get("ICPC_CACHE") or os.path.splitext(path)[0] + ".cache.db"
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def code_version(function):
+    """Hash of ``CACHE_FORMAT``, the file of ``function`` and this package."""
+    paths = sorted(
+        os.path.join(PACKAGE, name)
+        for name in os.listdir(PACKAGE)
+        if name.endswith(".py")
+    )
+    try:
+        paths.append(inspect.getsourcefile(function))
+    except TypeError:
+        pass
+    digest = hashlib.sha256(CACHE_FORMAT.encode())
+    for path in paths:
+        if path and os.path.exists(path):
+            digest.update(_source_digest(path).encode())
+    return digest.hexdigest()[:16]
+
+
+def view_key(name, args):
+    # Widgets give lists, the stored keys hold tuples.
+    return (name,) + tuple(tuple(a) if isinstance(a, list) else a for a in args)
+
+
+def result_key(section, version, args, code=""):
+    # Widget lists and tuples give the same key, like the stored views.
+    return repr((code, version) + view_key(section, args))
+
+
+class ResultCache:
+    """Pickled results in the SQLite file ``path``, at most ``max_bytes``."""
+
+    def __init__(self, path=None, max_bytes=MAX_BYTES):
+        self.path = path or results_path()
+        self.max_bytes = max_bytes
+        # Set once the file fails, the results are then only computed.
+        self.disabled = False
+        # sqlite3 connections stay in the thread that opened them.
+        self._local = threading.local()
+        # Writes of the reads since the last flush.
+        self._lock = threading.Lock()
+        self._used = {}
+        self._counts = Counter()
+        self._flushed = time.monotonic()
+        atexit.register(self.flush)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def _count(self, section, hit):
+        with self._lock:
+            self._counts[section, "hits" if hit else "misses"] += 1
+
+    def _flush(self, connection):
+        """Write the pending use times and counters, inside a transaction."""
+        with self._lock:
+            used, self._used = self._used, {}
+            counts, self._counts = self._counts, Counter()
+            self._flushed = time.monotonic()
+        connection.executemany(
+            "UPDATE results SET used = ? WHERE key = ?",
+            [(when, key) for key, when in used.items()],
+        )
+        for (section, column), n in counts.items():
+            connection.execute(
+                "INSERT INTO counters (section) VALUES (?) ON CONFLICT DO NOTHING",
+                (section,),
+            )
+            connection.execute(
+                f"UPDATE counters SET {column} = {column} + ? WHERE section = ?",
+                (n, section),
+            )
+
+    def flush(self):
+        """Write what the reads left pending, unless the file is unusable."""
+        if self.disabled:
+            return
+        try:
+            with self._connection() as connection:
+                self._flush(connection)
+        except _ERRORS:
+            self._disable()
+
+    def get(self, section, version, args, code=""):
+        """(True, result) when stored, else (False, None).
+
+        A result that no longer loads, after a library upgrade for example,
+        is deleted and counts as a miss.
+        """
+        key = result_key(section, version, args, code)
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        result = None
+        if row is not None:
+            try:
+                result = pickle.loads(row[0])
+            except Exception:
+                log.warning("dropping the unreadable result %s", key, exc_info=True)
+                with connection:
+                    connection.execute("DELETE FROM results WHERE key = ?", (key,))
+                row = None
+        self._count(section, row is not None)
+        if row is not None:
+            with self._lock:
+                self._used[key] = time.time()
+        if time.monotonic() - self._flushed > FLUSH_INTERVAL:
+            with connection:
+                self._flush(connection)
+        return row is not None, result
+
+    def put(self, section, version, args, result, code=""):
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_bytes:
+            return
+        with self._connection() as connection:
+            key = result_key(section, version, args, code)
+            connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, section, value, len(value), time.time()),
+            )
+            self._flush(connection)
+            self._evict(connection)
+
+    def _evict(self, connection):
+        (total,) = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM results ORDER BY used"
+        ):
+            evicted.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        connection.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+    def stats(self):
+        """Hits, misses, entries and bytes of every section, none when the
+        file cannot be used.
+        """
+        if self.disabled:
+            return []
+        try:
+            return self._stats()
+        except _ERRORS:
+            self._disable()
+            return []
+
+    def _stats(self):
+        with self._connection() as connection:
+            self._flush(connection)
+            rows = connection.execute(
+                """
+                SELECT c.section, c.hits, c.misses,
+                    COUNT(r.key), COALESCE(SUM(r.size), 0)
+                FROM counters c LEFT JOIN results r ON r.section = c.section
+                GROUP BY c.section ORDER BY c.section
+                """
+            ).fetchall()
+        return [
+            dict(zip(("section", "hits", "misses", "entries", "bytes"), row))
+            for row in rows
+        ]
+
+    def _disable(self):
+        log.exception("disabling the result cache %s", self.path)
+        self.disabled = True
+
+    def cached(self, function):
+        """Decorator for functions of a data version and parameters, in that
+        order. Results come from the file when they are there.
+
+        A file that cannot be used disables the cache, like a read-only
+        deployment, and the results are computed as without it.
+        """
+        section = function.__name__
+        code = code_version(function)
+
+        @functools.wraps(function)
+        def call(version, *args):
+            if self.disabled:
+                return function(version, *args)
+            try:
+                found, result = self.get(section, version, args, code)
+            except _ERRORS:
+                self._disable()
+                return function(version, *args)
+            profiling.count(f"{section} (disco)", miss=not found)
+            if found:
+                return result
+            result = function(version, *args)
+            try:
+                self.put(section, version, args, result, code)
+            except _ERRORS:
+                self._disable()
+            return result
+
+        return call
@@ -0,0 +1,99 @@
+"""Type-ahead search over the university names and their aliases.
+
+The selectors only send the best matches of what was typed to the browser.
+Every name, spelling and team alias is folded with ``canonical_key``. A
+query matches the start of any word of a folded key through a sorted list
+of word suffixes, and typos and fragments fall back to shared trigrams.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import NamedTuple
+
+import numpy as np
+
+from .identity import canonical_key
+
+# Share of the trigrams of a query a name must have to match without a prefix.
+MIN_TRIGRAMS = 0.6
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex(NamedTuple):
+    names: tuple
+    # Ids in alphabetical order of their names.
+    alphabetical: tuple
+    # (folded suffix starting at a word, id, whether it is the whole key),
+    # sorted by suffix.
+    suffixes: tuple
+    # Trigram to the sorted ids of the keys that have it.
+    grams: dict
+
+    def _prefixed(self, query):
+        """Ids whose keys have a word starting with ``query``, whole keys first."""
+        whole, inner = {}, {}
+        start = bisect_left(self.suffixes, (query,))
+        for suffix, university, first_word in self.suffixes[start:]:
+            if not suffix.startswith(query):
+                break
+            (whole if first_word else inner)[university] = None
+        return list(whole) + [u for u in inner if u not in whole]
+
+    def _similar(self, query):
+        """Ids sharing most trigrams with ``query``, the closest first."""
+        grams = [self.grams[g] for g in trigrams(query) if g in self.grams]
+        if not grams:
+            return []
+        ids, counts = np.unique(np.concatenate(grams), return_counts=True)
+        kept = counts >= MIN_TRIGRAMS * len(trigrams(query))
+        order = np.argsort(-counts[kept], kind="stable")
+        return ids[kept][order].tolist()
+
+    def search(self, query, limit=50, among=None):
+        """Names of the best ``limit`` matches of ``query`` among the ids of
+        ``among`` (every university when None). Without a query, the first
+        names in alphabetical order.
+        """
+        query = canonical_key(query or "")
+        if query:
+            found = self._prefixed(query)
+            found += self._similar(query)
+        else:
+            found = self.alphabetical
+        matches = {}
+        for university in found:
+            if among is None or university in among:
+                matches[university] = None
+                if len(matches) == limit:
+                    break
+        return [self.names[u] for u in matches]
+
+
+def build_search_index(identities):
+    # Spellings, canonical keys and team aliases all point to their id.
+    keys = defaultdict(set)
+    for name, university in identities.ids.items():
+        keys[canonical_key(name)].add(university)
+
+    suffixes = []
+    grams = defaultdict(set)
+    for key, universities in keys.items():
+        words = key.split()
+        for university in universities:
+            for i in range(len(words)):
+                suffixes.append((" ".join(words[i:]), university, i == 0))
+            for gram in trigrams(key):
+                grams[gram].add(university)
+    suffixes.sort(key=lambda x: (x[0], not x[2], identities.names[x[1]]))
+    return SearchIndex(
+        names=identities.names,
+        alphabetical=tuple(
+            sorted(range(len(identities.names)), key=lambda u: identities.names[u])
+        ),
+        suffixes=tuple(suffixes),
+        grams={g: np.array(sorted(u), dtype=np.int64) for g, u in grams.items()},
+    )
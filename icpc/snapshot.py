@@ -0,0 +1,278 @@
+"""Columnar Arrow snapshot of the results file, memory-mapped when loaded.
+
+The snapshot sits next to the JSON file and is rebuilt whenever the JSON
+content hash changes. Run ``python -m icpc snapshot`` to build it ahead of
+time. ``python -m icpc ingest`` appends a year to it instead, and records
+the versions it extends so a running app only reads the new rows.
+"""
+
+import json
+import os
+
+import numpy as np
+import pyarrow as pa
+
+from .dataset import (
+    DATA_PATH,
+    Dataset,
+    Team,
+    YearTeams,
+    file_digest,
+    load_dataset,
+    replacing,
+)
+from .identity import Identities
+
+SCHEMA = pa.schema(
+    [
+        ("year", pa.int16()),
+        ("position", pa.int32()),
+        ("country", pa.dictionary(pa.int32(), pa.string())),
+        ("university", pa.dictionary(pa.int32(), pa.string())),
+        ("team", pa.string()),
+        ("solved", pa.int32()),
+        ("time", pa.int32()),
+        ("players", pa.list_(pa.dictionary(pa.int32(), pa.string()))),
+        ("country_code", pa.int32()),
+        ("region_code", pa.int8()),
+        ("university_id", pa.int32()),
+    ]
+)
+
+# Layout of the snapshot, older ones are compiled again.
+FORMAT = "3"
+
+# Versions an appended snapshot remembers extending.
+PARENTS = 16
+
+
+def snapshot_path(path=DATA_PATH):
+    return os.path.splitext(path)[0] + ".arrow"
+
+
+def alias_rows(countries):
+    """[country, university, team] rows of the team aliases of ``countries``."""
+    return [
+        [country, university, team]
+        for country, details in countries.items()
+        for university, aliases in details.get("universities", {}).items()
+        for team in aliases["teams"]
+    ]
+
+
+def _table(dataset, years):
+    columns = {name: [] for name in SCHEMA.names}
+    for year in years:
+        for team in dataset.contests[str(year)]:
+            columns["year"].append(year)
+            for name in Team._fields:
+                columns[name].append(getattr(team, name))
+    columns["players"] = [list(players) for players in columns["players"]]
+    return pa.table(columns, schema=SCHEMA)
+
+
+def _metadata(dataset, aliases, parents=()):
+    countries = {
+        key: {k: v for k, v in details.items() if k != "universities"}
+        for key, details in dataset.countries.items()
+    }
+    return {
+        "format": FORMAT,
+        "version": dataset.version,
+        "meta": json.dumps(
+            {
+                "regions": dataset.regions,
+                "countries": countries,
+                "stats": dataset.stats,
+                "region_keys": dataset.region_keys,
+                "country_keys": dataset.country_keys,
+                "identities": dataset.identities._asdict(),
+            }
+        ),
+        "aliases": json.dumps(aliases),
+        "parents": json.dumps(list(parents)),
+    }
+
+
+def compile_snapshot(dataset, target, aliases=None):
+    if aliases is None:
+        aliases = alias_rows(dataset.countries)
+    table = _table(dataset, dataset.years)
+    _write(table.replace_schema_metadata(_metadata(dataset, aliases)), target)
+
+
+def append_snapshot(dataset, year, target, aliases, parent):
+    """Add the ``year`` rows of ``dataset`` to the snapshot of ``parent``.
+
+    The old rows are copied from the memory map, only the new year is
+    encoded.
+    """
+    old = pa.ipc.open_file(pa.memory_map(target, "r")).read_all()
+    # Older versions it extends, so a reader a few years behind can catch up.
+    parents = json.loads(old.schema.metadata.get(b"parents", b"[]"))
+    parents = (parents + [parent])[-PARENTS:]
+    table = pa.concat_tables([old.replace_schema_metadata(), _table(dataset, [year])])
+    table = table.unify_dictionaries()
+    _write(table.replace_schema_metadata(_metadata(dataset, aliases, parents)), target)
+
+
+def _write(table, target):
+    with replacing(target) as tmp:
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+def _decode(column):
+    """Python values of a dictionary array, sharing one str per distinct value."""
+    # Nulls point to the None appended at the end of the values.
+    values = column.dictionary.to_pylist() + [None]
+    return [values[i] for i in column.indices.fill_null(-1).to_numpy()]
+
+
+def _teams(table):
+    players = table.column("players").combine_chunks()
+    # A sliced table keeps the offsets of the whole column.
+    names = _decode(players.flatten())
+    offsets = players.offsets.to_numpy()
+    offsets = (offsets - offsets[0]).tolist()
+    rosters = [tuple(names[lo:hi]) for lo, hi in zip(offsets, offsets[1:])]
+
+    rows = zip(
+        table.column("position").to_numpy().tolist(),
+        _decode(table.column("country").combine_chunks()),
+        _decode(table.column("university").combine_chunks()),
+        table.column("team").to_pylist(),
+        table.column("solved").to_numpy().tolist(),
+        table.column("time").to_numpy().tolist(),
+        rosters,
+        table.column("country_code").to_numpy().tolist(),
+        table.column("region_code").to_numpy().tolist(),
+        table.column("university_id").to_numpy().tolist(),
+    )
+    return [Team(*row) for row in rows]
+
+
+def _by_year(table, teams):
+    years = table.column("year").to_numpy()
+    region_codes = table.column("region_code").to_numpy().astype(np.int64)
+    contests = {}
+    region_arrays = {}
+    bounds = np.flatnonzero(np.diff(years)) + 1
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(years)]):
+        if hi > lo:
+            year = str(years[lo])
+            contests[year] = tuple(teams[lo:hi])
+            region_arrays[year] = region_codes[lo:hi]
+    return contests, region_arrays
+
+
+def _dataset(metadata, contests, region_codes):
+    meta = json.loads(metadata[b"meta"])
+    return Dataset(
+        version=metadata[b"version"].decode(),
+        contests=contests,
+        regions=meta["regions"],
+        countries=meta["countries"],
+        stats=meta["stats"],
+        years=tuple(int(x) for x in contests),
+        region_keys=tuple(meta["region_keys"]),
+        country_keys=tuple(meta["country_keys"]),
+        region_codes=region_codes,
+        identities=Identities(
+            names=tuple(meta["identities"]["names"]),
+            ids=meta["identities"]["ids"],
+        ),
+    )
+
+
+def read_snapshot(target):
+    table = pa.ipc.open_file(pa.memory_map(target, "r")).read_all()
+    contests, region_codes = _by_year(table, _teams(table))
+    return _dataset(table.schema.metadata, contests, region_codes)
+
+
+def read_year_teams(target, year):
+    """``YearTeams`` of the ``year`` rows of the snapshot, straight from its
+    memory map. Players are numbered by their entry in its dictionary.
+    """
+    table = pa.ipc.open_file(pa.memory_map(target, "r")).read_all()
+    lo, hi = np.searchsorted(table.column("year").to_numpy(), [year, year + 1])
+    rows = table.slice(lo, hi - lo)
+    players = rows.column("players").combine_chunks()
+    names = players.flatten()
+    offsets = players.offsets.to_numpy()
+
+    def column(name):
+        return rows.column(name).to_numpy().astype(np.int64)
+
+    return YearTeams(
+        university=column("university_id"),
+        country=column("country_code"),
+        region=column("region_code"),
+        solved=column("solved"),
+        # Missing players share the code after the last name.
+        player=names.indices.fill_null(len(names.dictionary))
+        .to_numpy()
+        .astype(np.int64),
+        player_team=np.repeat(np.arange(hi - lo), np.diff(offsets)),
+    )
+
+
+def snapshot_parents(target):
+    try:
+        schema = pa.ipc.open_file(pa.memory_map(target, "r")).schema
+    except (OSError, pa.ArrowInvalid):
+        return []
+    return json.loads(schema.metadata.get(b"parents", b"[]"))
+
+
+def extend_dataset(dataset, target):
+    """``dataset`` plus the years the snapshot added after it.
+
+    Only the new rows are decoded, the old years are shared.
+    """
+    table = pa.ipc.open_file(pa.memory_map(target, "r")).read_all()
+    years = table.column("year").to_numpy()
+    start = int(np.searchsorted(years, max(dataset.years), side="right"))
+    new = table.slice(start)
+    contests, region_codes = _by_year(new, _teams(new))
+    return _dataset(
+        table.schema.metadata,
+        {**dataset.contests, **contests},
+        {**dataset.region_codes, **region_codes},
+    )
+
+
+def snapshot_version(target):
+    try:
+        schema = pa.ipc.open_file(pa.memory_map(target, "r")).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if schema.metadata.get(b"format", b"").decode() != FORMAT:
+        return None
+    return schema.metadata.get(b"version", b"").decode()
+
+
+def read_aliases(path=DATA_PATH):
+    """(country, university, team) alias rows, kept out of the Dataset."""
+    target = snapshot_path(path)
+    if snapshot_version(target) == file_digest(path):
+        schema = pa.ipc.open_file(pa.memory_map(target, "r")).schema
+        return [tuple(x) for x in json.loads(schema.metadata[b"aliases"])]
+    with open(path, "rb") as file:
+        return [tuple(x) for x in alias_rows(json.load(file)["countries"])]
+
+
+def load_snapshot(path=DATA_PATH):
+    """Dataset of ``path``, through its snapshot, compiling it when it is stale."""
+    target = snapshot_path(path)
+    if snapshot_version(target) == file_digest(path):
+        return read_snapshot(target)
+    dataset = load_dataset(path)
+    try:
+        compile_snapshot(dataset, target)
+    except OSError:
+        # Read-only deployments keep working from the JSON file.
+        pass
+    return dataset
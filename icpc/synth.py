@@ -0,0 +1,150 @@
+"""Synthetic results files with the schema of ``data-2006-2024.json``.
+
+Meant for load testing: the sizes are free and the same seed always produces
+the same file. ``python -m icpc synth out.json --teams 20000`` writes one.
+"""
+
+import json
+import random
+import string
+
+REGIONS = {
+    "na": {"name": "North America", "spanish_name": "América del Norte"},
+    "la": {"name": "Latin America", "spanish_name": "América Latina"},
+    "eu": {"name": "Europe", "spanish_name": "Europa"},
+    "ne": {"name": "Northern Eurasia", "spanish_name": "Eurasia del Norte"},
+    "aa": {"name": "Africa and Arab", "spanish_name": "África y Arabia"},
+    "aw": {"name": "Asia West Continent", "spanish_name": "Asia Oeste Continental"},
+    "ae": {"name": "Asia East Continent", "spanish_name": "Asia Este Continental"},
+    "ap": {"name": "Asia Pacific", "spanish_name": "Asia Pacífico"},
+}
+
+# Share of roster slots left empty, as a few teams of the real file have.
+MISSING_PLAYER = 0.002
+
+
+def _ranked(teams):
+    """Sort by solved and time, ties share a ``"a - b"`` position."""
+    teams.sort(key=lambda t: (-t["solved"], t["time"]))
+    start = 0
+    while start < len(teams):
+        end = start + 1
+        key = (teams[start]["solved"], teams[start]["time"])
+        while end < len(teams) and (teams[end]["solved"], teams[end]["time"]) == key:
+            end += 1
+        position = str(start + 1) if end - start == 1 else f"{start + 1} - {end}"
+        for team in teams[start:end]:
+            team["position"] = position
+            team["solved"] = str(team["solved"])
+            team["time"] = str(team["time"])
+        start = end
+    return teams
+
+
+def generate(
+    teams=140,
+    years=19,
+    universities=600,
+    countries=80,
+    reuse=0.3,
+    problems=12,
+    last_year=2024,
+    seed=0,
+):
+    """Results dict with ``teams`` finalists per year for ``years`` years.
+
+    Universities get a fixed strength and a skewed popularity, so a few of
+    them qualify most years and some send several teams. ``reuse`` is the
+    chance that a roster slot goes to a player that already competed for the
+    same university the year before.
+    """
+    rng = random.Random(seed)
+    first_year = last_year - years + 1
+
+    region_keys = list(REGIONS)
+    country_names = [f"Country {i:03d}" for i in range(countries)]
+    country_data = {}
+    for i, name in enumerate(country_names):
+        country_data[name] = {
+            "region": rng.choice(region_keys),
+            "domain": f"c{i}",
+            "spanish_name": f"País {i:03d}",
+            "universities": {},
+        }
+
+    names = [f"University {i:05d}" for i in range(universities)]
+    home = {u: rng.choice(country_names) for u in names}
+    strength = {u: rng.random() for u in names}
+    weights = [1 / (rank + 1) ** 0.8 for rank in range(universities)]
+    rng.shuffle(weights)
+
+    letters = string.ascii_uppercase[:problems]
+    contests = {}
+    stats = {}
+    previous = {}
+    next_player = 0
+    for year in range(first_year, last_year + 1):
+        roster = {}
+        sent = {}
+        available = {}
+        results = []
+        for university in rng.choices(names, weights, k=teams):
+            sent[university] = sent.get(university, 0) + 1
+            team_name = f"{university[11:]} #{sent[university]}"
+            # Each veteran plays for a single team of the year.
+            veterans = available.setdefault(
+                university, list(previous.get(university, []))
+            )
+            players = []
+            for _ in range(3):
+                if rng.random() < MISSING_PLAYER:
+                    players.append(None)
+                elif veterans and rng.random() < reuse:
+                    players.append(veterans.pop(rng.randrange(len(veterans))))
+                else:
+                    players.append(f"Player {next_player:07d}")
+                    next_player += 1
+            roster.setdefault(university, []).extend(players)
+
+            aliases = country_data[home[university]]["universities"]
+            team_names = aliases.setdefault(university, {"teams": []})["teams"]
+            if team_name not in team_names:
+                team_names.append(team_name)
+
+            chance = 0.15 + 0.7 * strength[university]
+            solved = sum(rng.random() < chance for _ in range(problems))
+            time = sum(rng.randint(10, 300) for _ in range(solved))
+            results.append(
+                {
+                    "country": home[university],
+                    "university": university,
+                    "team": team_name,
+                    "solved": solved,
+                    "time": time,
+                    "players": players,
+                }
+            )
+
+        contests[str(year)] = [
+            {"position": team.pop("position"), **team} for team in _ranked(results)
+        ]
+        previous = {u: [p for p in ps if p is not None] for u, ps in roster.items()}
+        stats[str(year)] = {
+            "finalists": teams,
+            "students": teams * 3 * 50,
+            "universities": len(roster),
+            "countries": len({home[u] for u in roster}),
+            "problems": letters,
+        }
+
+    return {
+        "contests": contests,
+        "countries": country_data,
+        "regions": REGIONS,
+        "stats": dict(reversed(stats.items())),
+    }
+
+
+def write_synthetic(target, **options):
+    with open(target, "w", encoding="UTF-8") as file:
+        json.dump(generate(**options), file, ensure_ascii=False, indent=4)
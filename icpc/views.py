@@ -0,0 +1,147 @@
+"""Engine results and figures for the default parameters, computed ahead of time.
+
+``python -m icpc views`` stores them next to the data file. Most visitors
+never touch a widget, so their first page is served from that file and the
+engine only runs when a parameter changes.
+"""
+
+import logging
+import os
+import pickle
+
+from . import figures
+from .dataset import ALL_REGIONS, DATA_PATH, replacing
+from .results import code_version, view_key
+from .snapshot import FORMAT
+
+# Parameters the sections open with, the widgets of the app start there.
+DEFAULT_FIRST = 2010
+DEFAULT_MIN_PARTS = 10
+DEFAULT_MIN_FINALISTS = 5
+DEFAULT_AMOUNT = 50
+DEFAULT_TABLE_MIN_PARTS = 1
+
+log = logging.getLogger(__name__)
+
+
+def views_path(path=DATA_PATH):
+    return os.path.splitext(path)[0] + ".views.pkl"
+
+
+def _parameters(engine):
+    # The rankings show every university when there are fewer than the default.
+    first, last = DEFAULT_FIRST, max(engine.dataset.years)
+    everywhere = (ALL_REGIONS,)
+    amount = min(len(engine.university_ids(first, last, everywhere)), DEFAULT_AMOUNT)
+    return first, last, everywhere, amount
+
+
+def default_calls(engine):
+    """(method, args) of every table the sections ask for on their first run."""
+    first, last, everywhere, amount = _parameters(engine)
+    return [
+        ("country_participations", (first, last, everywhere, DEFAULT_MIN_PARTS)),
+        ("university_participations", (first, last, everywhere, DEFAULT_MIN_PARTS)),
+        ("university_ids", (first, last)),
+        ("university_ids", (first, last, everywhere)),
+        ("solved_stats", (first, last, everywhere)),
+        ("solved_by_university", (first, last, ())),
+        ("best_teams", (first, last, everywhere, ())),
+        ("place_bands", (first, last, everywhere)),
+        ("solved_bands", (first, last, everywhere)),
+        ("top_accumulated", (first, last, everywhere, amount)),
+        ("top_repeated", (first, last, everywhere, amount)),
+        ("finalists_by_country", (first, last, everywhere, DEFAULT_MIN_FINALISTS)),
+        ("university_tables", (first, last, everywhere, DEFAULT_TABLE_MIN_PARTS)),
+        ("country_tables", (first, last, everywhere, DEFAULT_TABLE_MIN_PARTS)),
+    ]
+
+
+def default_figures(engine):
+    """(function of ``icpc.figures``, args) of every figure of a first run."""
+    first, last, everywhere, amount = _parameters(engine)
+    return [
+        ("country_figure", (first, last, everywhere, DEFAULT_MIN_PARTS)),
+        ("university_figure", (first, last, everywhere, DEFAULT_MIN_PARTS)),
+        ("solved_figure", (first, last, everywhere, ())),
+        ("place_figures", (first, last, everywhere, (), False)),
+        ("accumulated_figures", (first, last, everywhere, amount)),
+        ("team_figures", (first, last, everywhere, amount)),
+        ("finalists_figure", (first, last, everywhere, DEFAULT_MIN_FINALISTS)),
+    ]
+
+
+def default_views(engine):
+    """Results of every ``default_calls`` and ``default_figures`` entry, by
+    ``view_key``. The figures are built from the stored tables.
+    """
+    views = Views(engine, {})
+    for name, args in default_calls(engine):
+        views.stored[view_key(name, args)] = getattr(engine, name)(*args)
+    for name, args in default_figures(engine):
+        views.stored[view_key(name, args)] = views.figure(name, *args)
+    return views.stored
+
+
+def compile_views(engine, target, views=None):
+    """Store the default views of ``engine``, computed unless given."""
+    if views is None:
+        views = default_views(engine)
+    stored = {
+        "format": (FORMAT, code_version(default_views)),
+        "version": engine.dataset.version,
+        "views": views,
+    }
+    with replacing(target) as tmp:
+        with open(tmp, "wb") as file:
+            pickle.dump(stored, file)
+
+
+def read_views(version, path=DATA_PATH):
+    """Stored views of the ``version`` data, empty when missing or stale."""
+    try:
+        with open(views_path(path), "rb") as file:
+            stored = pickle.load(file)
+    except OSError:
+        return {}
+    except Exception:
+        # Truncated, or written by other versions of the libraries.
+        log.warning("ignoring the unreadable views of %s", path, exc_info=True)
+        return {}
+    # Views of an older snapshot format may name universities differently,
+    # and other code may compute them differently.
+    if (
+        not isinstance(stored, dict)
+        or stored.get("format") != (FORMAT, code_version(default_views))
+        or stored.get("version") != version
+    ):
+        return {}
+    return stored["views"]
+
+
+class Views:
+    """An engine that answers the stored calls without computing them."""
+
+    def __init__(self, engine, stored):
+        self.engine = engine
+        self.stored = stored
+
+    def figure(self, name, *args):
+        """Figure ``name`` of ``icpc.figures``, stored or built here."""
+        key = view_key(name, args)
+        if key in self.stored:
+            return self.stored[key]
+        return getattr(figures, name)(self, *args)
+
+    def __getattr__(self, name):
+        method = getattr(self.engine, name)
+        if not callable(method):
+            return method
+
+        def view(*args):
+            key = view_key(name, args)
+            if key in self.stored:
+                return self.stored[key]
+            return method(*args)
+
+        return view
@@ -0,0 +1,93 @@
+"""Hot reload of the results file, without a cold first run.
+
+``DataWatcher`` polls the size and mtime of the results file and of its
+stored views. When they change and the content hash is new, the engine is
+extended or rebuilt in a background thread, and so are its default views
+when no stored file matches the new version. The new engine and its views
+replace the old ones in one assignment once they are complete, so runs
+keep reading the previous version until then and never see half of one.
+"""
+
+import logging
+import os
+import threading
+
+from .dataset import DATA_PATH, file_digest
+from .ingest import refresh
+from .views import Views, compile_views, default_views, read_views, views_path
+
+# Seconds between two looks at the files.
+WATCH_INTERVAL = 2.0
+
+log = logging.getLogger(__name__)
+
+
+def _stat(path):
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+class DataWatcher:
+    """Engine of ``path`` and its stored views, kept up to date by a thread."""
+
+    def __init__(self, path=DATA_PATH, interval=WATCH_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._seen = self._stats()
+        engine = refresh(None, path)
+        # Read by every run, only ever replaced as a whole.
+        self.current = Views(engine, read_views(engine.dataset.version, path))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._watch, name="data-watcher", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def version(self):
+        return self.current.engine.dataset.version
+
+    def _stats(self):
+        return _stat(self.path), _stat(views_path(self.path))
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """Swap in the current content of the files when it changed."""
+        seen = self._stats()
+        if seen == self._seen:
+            return
+        # A file that fails to load is retried on its next change only.
+        self._seen = seen
+        try:
+            self.current = self._load(self.current)
+        except Exception:
+            log.exception(
+                "keeping version %s, %s failed to load", self.version, self.path
+            )
+
+    def _load(self, current):
+        if file_digest(self.path) == self.version:
+            # Same content, a touch or the views were written.
+            engine = current.engine
+        else:
+            engine = refresh(current.engine, self.path)
+            log.info("loaded version %s of %s", engine.dataset.version, self.path)
+        stored = read_views(engine.dataset.version, self.path)
+        if not stored:
+            # A direct edit of the file comes without views, the first run
+            # after it would compute every section.
+            stored = default_views(engine)
+            try:
+                compile_views(engine, views_path(self.path), stored)
+            except OSError:
+                log.warning("views of %s kept in memory only", self.path)
+        return Views(engine, stored)
+
+    def close(self):
+        self._stop.set()
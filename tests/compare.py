@@ -0,0 +1,27 @@
+"""Engine parts and views as plain values, equal when the parts hold the same data."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+def plain(value):
+    if isinstance(value, np.ndarray):
+        return ("array", value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("pandas", value.to_json(orient="split"))
+    if isinstance(value, go.Figure):
+        # Unpickled layouts may list their keys in another order.
+        return ("figure", json.dumps(json.loads(value.to_json()), sort_keys=True))
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    return value
+
+
+def engine_parts(engine):
+    """Cubes, player index, rank grid and histogram, without the dataset."""
+    return [plain(part) for part in engine[1:]]
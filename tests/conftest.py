@@ -0,0 +1,19 @@
+import pytest
+
+from icpc import build_engine, generate, parse_dataset
+
+
+@pytest.fixture(scope="session")
+def data():
+    # Small enough to build in a moment, with several teams per university.
+    return generate(teams=80, years=6, universities=120, countries=20, seed=7)
+
+
+@pytest.fixture(scope="session")
+def dataset(data):
+    return parse_dataset(data, "synthetic")
+
+
+@pytest.fixture(scope="session")
+def engine(dataset):
+    return build_engine(dataset)
@@ -0,0 +1,98 @@
+import copy
+import statistics
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from icpc import ALL_REGIONS, UNKNOWN, build_engine, parse_dataset
+from icpc.engine import SOLVED_STATS, descending
+
+
+def regions_cases(dataset):
+    first = next(iter(dataset.regions.values()))["spanish_name"]
+    return [(ALL_REGIONS,), (first,)]
+
+
+def test_repeat_stats_match_a_walk_over_the_teams(dataset, engine):
+    first, last = dataset.years[1], dataset.years[-1]
+    n = len(dataset.identities.names)
+    for regions in regions_cases(dataset):
+        mask = dataset.region_mask(regions)
+        expected = {
+            column: np.zeros(n, dtype=np.int64)
+            for column in ("teams", "players", "repeated", "repeated_players")
+        }
+        seen = set()
+        for year in range(first, last + 1):
+            for team in dataset.contests[str(year)]:
+                if not (mask >> team.region_code) & 1:
+                    continue
+                u = team.university_id
+                expected["teams"][u] += 1
+                repeated = [(p, u) in seen for p in team.players]
+                expected["players"][u] += repeated.count(False)
+                expected["repeated_players"][u] += repeated.count(True)
+                expected["repeated"][u] += any(repeated)
+                seen.update((p, u) for p in team.players)
+
+        stats = engine.players.repeat_stats(first, last, mask)
+        for column, counts in expected.items():
+            assert stats[column].tolist() == counts.tolist(), column
+
+
+def assert_solved_stats(dataset, engine):
+    first, last = dataset.years[0], dataset.years[-1]
+    for regions in regions_cases(dataset):
+        mask = dataset.region_mask(regions)
+        table = engine.solved_stats(first, last, regions)
+        for year in range(first, last + 1):
+            solved = [
+                team.solved
+                for team in dataset.contests[str(year)]
+                if (mask >> team.region_code) & 1 and team.solved != UNKNOWN
+            ]
+            if not solved:
+                assert table.loc[year].isna().all()
+                continue
+            expected = (
+                min(solved),
+                max(solved),
+                statistics.mode(solved),
+                round(statistics.median(solved)),
+                statistics.mean(solved),
+            )
+            assert table.loc[year, list(SOLVED_STATS)].tolist() == pytest.approx(
+                expected
+            )
+
+
+def test_solved_stats_match_the_statistics_module(dataset, engine):
+    assert_solved_stats(dataset, engine)
+
+
+def test_solved_stats_leave_out_unknown_solved(data):
+    data = copy.deepcopy(data)
+    years = sorted(data["contests"])
+    for year in years:
+        for n, team in enumerate(data["contests"][year]):
+            # Every team of the first year, a few of the others.
+            if year == years[0] or n % 7 == 0:
+                team["solved"] = "?"
+    dataset = parse_dataset(data, "unknown")
+    assert_solved_stats(dataset, build_engine(dataset))
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 20, 50])
+def test_descending_matches_a_full_sort(n):
+    rng = np.random.default_rng(n)
+    values = rng.integers(0, 6, 40).astype(float)
+    values[rng.random(40) < 0.2] = np.nan
+    keep = rng.random(40) < 0.8
+    keys = [f"k{i}" for i in range(40)]
+
+    kept = [i for i in range(40) if keep[i]]
+    order = sorted(kept, key=lambda i: (np.isnan(values[i]), -np.nan_to_num(values[i])))
+    expected = pd.Series(values[order[:n]], index=[keys[i] for i in order[:n]])
+
+    pd.testing.assert_series_equal(descending(keys, values, keep, n), expected)
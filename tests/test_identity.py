@@ -0,0 +1,86 @@
+import pytest
+
+from icpc import build_identities, canonical_key
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("Institute of Physics & Technology", "Institute of Physics and Technology"),
+        ("The University of Tokyo", "University of Tokyo"),
+        ("Instituto Tecnológico de Monterrey", "Instituto Tecnologico de Monterrey"),
+        ("ＭＩＴ", "MIT"),
+    ],
+)
+def test_spellings_of_a_university_share_a_key(first, second):
+    assert canonical_key(first) == canonical_key(second)
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("北京大学", "清华大学"),
+        ("Дальневосточный университет", "Дальневосточныи университет"),
+        ("جامعة القاهرة", "جامعة الإسكندرية"),
+        ("Łódź University of Technology", "Lodz University of Technology"),
+        ("The", "the university"),
+    ],
+)
+def test_different_names_keep_different_keys(first, second):
+    assert canonical_key(first) != canonical_key(second)
+
+
+@pytest.mark.parametrize(
+    "name, key",
+    [
+        ("北京大学", "北京大学"),
+        ("Новосибирский Университет", "новосибирский университет"),
+        ("جامعة القاهرة", "جامعة القاهرة"),
+        ("ITMO University (St. Petersburg)", "itmo university st petersburg"),
+    ],
+)
+def test_other_scripts_are_kept_casefolded(name, key):
+    assert canonical_key(name) == key
+
+
+def test_identities_merge_spellings_in_order_of_appearance():
+    spellings = [
+        "北京大学",
+        "The University of Tokyo",
+        "Московский государственный университет",
+        "University of Tokyo",
+        "Physics & Technology",
+        "جامعة القاهرة",
+        "Physics and Technology",
+        "Московский Государственный Университет",
+        "清华大学",
+    ]
+    identities = build_identities(spellings, [("Physics and Technology", "PT #1")])
+    assert identities.names == (
+        "北京大学",
+        "The University of Tokyo",
+        "Московский государственный университет",
+        "Physics & Technology",
+        "جامعة القاهرة",
+        "清华大学",
+    )
+    assert [identities.lookup(s) for s in spellings] == [0, 1, 2, 1, 3, 4, 3, 2, 5]
+    assert identities.lookup("PT #1") == 3
+    # New spellings of a known university resolve, unknown names do not.
+    assert identities.lookup("the physics and technology") == 3
+    assert identities.lookup("北京大學") is None
+
+
+def test_a_team_listed_under_two_universities_identifies_neither():
+    identities = build_identities(
+        ["Universidad de Oriente", "Universidad de La Habana"],
+        [
+            ("Universidad de Oriente", "UO #1"),
+            ("Universidad de La Habana", "UH #1"),
+            ("Universidad de Oriente", "Shared"),
+            ("Universidad de La Habana", "Shared"),
+        ],
+    )
+    assert identities.lookup("UO #1") == 0
+    assert identities.lookup("UH #1") == 1
+    assert identities.lookup("Shared") is None
@@ -0,0 +1,13 @@
+from icpc import build_engine, extend_engine, parse_dataset
+
+from .compare import engine_parts
+
+
+def test_extend_engine_matches_a_full_build(data, dataset, engine):
+    # The file as it was two years ago, with fewer universities known.
+    kept = [str(year) for year in dataset.years[:-2]]
+    old = {**data, "contests": {year: data["contests"][year] for year in kept}}
+    extended = extend_engine(build_engine(parse_dataset(old, "old")), dataset)
+
+    assert extended.dataset is dataset
+    assert engine_parts(extended) == engine_parts(engine)
@@ -0,0 +1,13 @@
+import pytest
+
+from icpc import compile_snapshot, precompute_engine
+
+from .compare import engine_parts
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_snapshot_aggregates_match_the_serial_build(dataset, engine, tmp_path, workers):
+    target = tmp_path / "data.arrow"
+    compile_snapshot(dataset, target)
+    pooled = precompute_engine(dataset, workers, str(target))
+    assert engine_parts(pooled) == engine_parts(engine)
@@ -0,0 +1,17 @@
+from icpc import compile_snapshot
+from icpc.snapshot import read_snapshot
+
+from .compare import plain
+
+
+def test_read_snapshot_gives_back_the_compiled_dataset(dataset, tmp_path):
+    target = tmp_path / "data.arrow"
+    compile_snapshot(dataset, target)
+    read = read_snapshot(str(target))
+    # The team aliases of the countries are stored apart from the dataset.
+    countries = {
+        key: {k: v for k, v in details.items() if k != "universities"}
+        for key, details in dataset.countries.items()
+    }
+    assert plain(read) == plain(dataset._replace(countries=countries))
+    assert read.identities == dataset.identities
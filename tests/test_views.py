@@ -0,0 +1,18 @@
+from icpc import Views, compile_views, default_views, read_views, views_path
+from icpc.views import default_figures
+
+from .compare import plain
+
+
+def test_stored_views_answer_the_default_figures(dataset, engine, tmp_path):
+    path = str(tmp_path / "data.json")
+    compile_views(engine, views_path(path))
+    stored = read_views(dataset.version, path)
+    assert plain(stored) == plain(default_views(engine))
+    assert read_views("other", path) == {}
+
+    views = Views(engine, stored)
+    for name, args in default_figures(engine):
+        figure = views.figure(name, *args)
+        assert figure is stored[(name,) + args]
+        assert plain(figure) == plain(Views(engine, {}).figure(name, *args))